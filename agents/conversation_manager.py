@@ -3,12 +3,135 @@
 负责保存和检索对话历史，支持上下文理解
 """
 
+import asyncio
+import atexit
+import queue
 import sqlite3
 import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from contextlib import contextmanager
 from datetime import datetime
 from typing import List, Dict, Optional, Any
 from pathlib import Path
 
+from modules.ttl_cache import TTLLRUCache
+
+# orjson（可选）序列化速度远快于标准库 json，未安装时回退
+try:
+    import orjson
+    
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+    
+    _loads = json.loads
+
+
+# 数据库结构版本（记录在 PRAGMA user_version），修改 _create_schema 时需递增
+SCHEMA_VERSION = 2
+
+# 后台写线程每批最多合并的写入数，以及第一项到达后等待后续写入的时间（秒）
+WRITE_BATCH_SIZE = 100
+WRITE_BATCH_WAIT = 0.05
+
+# 单次读取的历史轮数上限，避免长会话时加载、扫描的数据随轮数无限增长
+MAX_HISTORY_TURNS = 50
+
+# 热路径 SQL 统一定义为模块常量：同一字符串对象作为 sqlite3 连接内预编译语句缓存的键，
+# 配合常驻连接，每条语句只需解析一次
+_SQL_CREATE_SESSION = """
+    INSERT OR IGNORE INTO sessions (session_id, user_id)
+    VALUES (?, ?)
+"""
+
+# 当前最大轮次同时查主表和归档表：归档会话再次活跃时，轮次编号接着归档前的继续，
+# 而不是从 1 重新开始（否则与归档中的轮次重号）
+_SQL_MAX_TURN = """
+    SELECT MAX(
+        (SELECT COALESCE(MAX(turn_number), 0) FROM conversations WHERE session_id = ?1),
+        (SELECT COALESCE(MAX(turn_number), 0) FROM conversations_archive WHERE session_id = ?1)
+    )
+"""
+
+# 归档时显式列出列名，两张表的列顺序不同也不会错位
+_CONVERSATION_COLUMNS = """
+    id, session_id, user_id, turn_number, user_message, assistant_message,
+    intent, intent_confidence, extracted_data, created_at
+"""
+
+_SQL_INSERT_TURN = """
+    INSERT INTO conversations
+    (session_id, user_id, turn_number, user_message, assistant_message,
+     intent, intent_confidence, extracted_data)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# UPSERT：已有会话只更新活跃时间和轮数，保留 started_at / session_summary
+# （INSERT OR REPLACE 会删除旧行再插入，把这两列重置为默认值）
+_SQL_TOUCH_SESSION = """
+    INSERT INTO sessions (session_id, user_id, last_active_at, total_turns)
+    VALUES (?, ?, CURRENT_TIMESTAMP, ?)
+    ON CONFLICT(session_id) DO UPDATE SET
+        last_active_at = CURRENT_TIMESTAMP,
+        total_turns = excluded.total_turns
+"""
+
+# 子查询取最近 N 轮，外层再按轮次正序返回（最早的在前），Python 侧无需反转
+_SQL_HISTORY = """
+    SELECT * FROM (
+        SELECT turn_number, user_message, assistant_message, intent,
+               intent_confidence, extracted_data, created_at
+        FROM conversations
+        WHERE session_id = ?
+        ORDER BY turn_number DESC
+        LIMIT ?
+    )
+    ORDER BY turn_number ASC
+"""
+
+_SQL_SESSION_INFO = """
+    SELECT user_id, total_turns, started_at, last_active_at
+    FROM sessions
+    WHERE session_id = ?
+"""
+
+_SQL_INTENT_DISTRIBUTION = """
+    SELECT intent, COUNT(*) as count
+    FROM conversations
+    WHERE session_id = ?
+    GROUP BY intent
+"""
+
+_SQL_SIMILAR_CONVERSATIONS = """
+    SELECT session_id, user_message, assistant_message, created_at
+    FROM conversations
+    WHERE user_id = ? AND intent = ?
+    ORDER BY created_at DESC
+    LIMIT ?
+"""
+
+
+def _rows_to_dicts(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+    """按列名把查询结果转换为字典列表（列名只从 cursor.description 读取一次）"""
+    cols = [c[0] for c in cursor.description]
+    return [dict(zip(cols, row)) for row in cursor]
+
+
+def _history_from_rows(cols: tuple, rows: list) -> List[Dict[str, Any]]:
+    """由缓存的原始行构建历史记录（每次调用都生成新的字典，调用方可随意修改）"""
+    history = [dict(zip(cols, row)) for row in rows]
+    for turn in history:
+        if turn["extracted_data"]:
+            turn["extracted_data"] = _loads(turn["extracted_data"])
+    return history
+
 
 class ConversationManager:
     """
@@ -21,19 +144,95 @@ class ConversationManager:
         db_dir = Path(db_path).parent
         if str(db_dir) != '.':  # 只有当不是当前目录时才创建
             db_dir.mkdir(parents=True, exist_ok=True)
+        # 每个线程复用一条长连接（sqlite3 连接不能跨线程共享）
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        # 会话历史读缓存：session_id -> (last_n_turns, 列名, 原始行)，写入该会话时失效
+        self._history_cache = TTLLRUCache(maxsize=1024, ttl=60)
+        # 每次写入递增的会话版本号，防止并发读取把写入前的旧结果放回缓存
+        self._history_versions: "Counter[str]" = Counter()
+        # 后台写线程（首次异步写入时启动）：攒批后用一个事务提交
+        self._write_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
         self._init_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        """
+        获取当前线程的数据库连接（首次使用时创建并配置）
+        WAL 模式下读操作不会被写入阻塞（journal_mode 写入数据库文件，对所有连接生效），
+        synchronous=NORMAL 在 WAL 下仍能保证一致性，同时减少 fsync 次数；
+        连接常驻可复用 SQLite 的页缓存，写操作通过 _transaction() 显式提交
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                check_same_thread=False,
+                isolation_level=None,
+                cached_statements=256
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA cache_size=-64000")
+            conn.execute("PRAGMA mmap_size=268435456")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+    
+    @contextmanager
+    def _transaction(self):
+        """写事务：BEGIN IMMEDIATE ... COMMIT，异常时回滚"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn.cursor()
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    
+    def _invalidate_history(self, session_id: str):
+        with self._connections_lock:
+            self._history_versions[session_id] += 1
+        self._history_cache.pop(session_id)
+    
+    def close(self):
+        """关闭所有线程打开的数据库连接（先等待排队中的写入完成）"""
+        self.flush()
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+    
     def _init_database(self):
         """初始化数据库表"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            self._connect()
         except sqlite3.OperationalError as e:
             print(f"❌ 数据库连接失败: {e}")
             print(f"📁 数据库路径: {Path(self.db_path).absolute()}")
             print(f"💡 提示: 检查文件路径和权限")
             raise
-        cursor = conn.cursor()
         
+        # 已是当前结构版本时跳过全部 DDL（热启动只需读一次文件头）
+        if self._connect().execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        
+        # 建表和建索引放在同一个事务中，只提交一次
+        with self._transaction() as cursor:
+            self._create_schema(cursor)
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    
+    def _create_schema(self, cursor: sqlite3.Cursor):
+        """创建表和索引（在调用方的事务内执行）"""
         # 会话表
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS conversations (
@@ -63,6 +262,22 @@ class ConversationManager:
             )
         """)
         
+        # 归档表：长期不活跃会话的对话移到这里，让主表和索引保持小而热
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS conversations_archive (
+                id INTEGER PRIMARY KEY,
+                session_id TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                turn_number INTEGER NOT NULL,
+                user_message TEXT NOT NULL,
+                assistant_message TEXT,
+                intent TEXT,
+                intent_confidence REAL,
+                extracted_data TEXT,
+                created_at TIMESTAMP
+            )
+        """)
+        
         # 创建索引
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_conversations_session 
@@ -72,25 +287,29 @@ class ConversationManager:
             CREATE INDEX IF NOT EXISTS idx_conversations_user 
             ON conversations(user_id)
         """)
-        
-        conn.commit()
-        conn.close()
+        # 相似对话检索：user_id + intent 过滤，按时间倒序
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_conversations_user_intent_created
+            ON conversations(user_id, intent, created_at DESC)
+        """)
+        # 会话意图分布统计：session_id 过滤后按 intent 分组（覆盖索引）
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_conversations_session_intent
+            ON conversations(session_id, intent)
+        """)
+        # 归档表按会话查询最大轮次（_SQL_MAX_TURN）
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_conversations_archive_session_turn
+            ON conversations_archive(session_id, turn_number)
+        """)
     
     def create_session(self, user_id: str, session_id: Optional[str] = None) -> str:
         """创建新会话"""
         if not session_id:
             session_id = f"{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT OR IGNORE INTO sessions (session_id, user_id)
-            VALUES (?, ?)
-        """, (session_id, user_id))
-        
-        conn.commit()
-        conn.close()
+        with self._transaction() as cursor:
+            cursor.execute(_SQL_CREATE_SESSION, (session_id, user_id))
         
         return session_id
     
@@ -105,76 +324,232 @@ class ConversationManager:
         extracted_data: Optional[Dict[str, Any]] = None
     ) -> int:
         """添加一轮对话"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # JSON 编码放在事务之外，缩短写锁持有时间
+        extracted_json = _dumps(extracted_data) if extracted_data else None
         
-        # 获取当前轮次
-        cursor.execute("""
-            SELECT COALESCE(MAX(turn_number), 0) + 1
-            FROM conversations
-            WHERE session_id = ?
-        """, (session_id,))
-        turn_number = cursor.fetchone()[0]
+        with self._transaction() as cursor:
+            # 获取当前轮次
+            cursor.execute(_SQL_MAX_TURN, (session_id,))
+            turn_number = cursor.fetchone()[0] + 1
+            
+            # 插入对话
+            cursor.execute(_SQL_INSERT_TURN, (
+                session_id, user_id, turn_number, user_message, assistant_message,
+                intent, intent_confidence, extracted_json
+            ))
+            
+            # 更新会话元数据
+            cursor.execute(_SQL_TOUCH_SESSION, (session_id, user_id, turn_number))
         
-        # 插入对话
-        cursor.execute("""
-            INSERT INTO conversations 
-            (session_id, user_id, turn_number, user_message, assistant_message, 
-             intent, intent_confidence, extracted_data)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            session_id, user_id, turn_number, user_message, assistant_message,
-            intent, intent_confidence, 
-            json.dumps(extracted_data, ensure_ascii=False) if extracted_data else None
-        ))
-        
-        # 更新会话元数据
-        cursor.execute("""
-            INSERT OR REPLACE INTO sessions (session_id, user_id, last_active_at, total_turns)
-            VALUES (?, ?, CURRENT_TIMESTAMP, ?)
-        """, (session_id, user_id, turn_number))
+        self._invalidate_history(session_id)
+        return turn_number
+    
+    def add_turns_bulk(self, turns: List[Dict[str, Any]]) -> List[int]:
+        """
+        批量添加多轮对话（一个事务内完成）
         
-        conn.commit()
-        conn.close()
+        Args:
+            turns: 每项包含 add_turn 的同名参数（session_id, user_id, user_message, ...）
         
-        return turn_number
+        Returns:
+            每轮对应的轮次编号
+        """
+        if not turns:
+            return []
+        
+        # JSON 编码在事务之外一次性完成
+        extracted_json = [
+            _dumps(t["extracted_data"]) if t.get("extracted_data") else None
+            for t in turns
+        ]
+        
+        with self._transaction() as cursor:
+            # 每个会话只查询一次当前最大轮次，之后在内存中递增
+            next_turn: Dict[str, int] = {}
+            for session_id in {t["session_id"] for t in turns}:
+                cursor.execute(_SQL_MAX_TURN, (session_id,))
+                next_turn[session_id] = cursor.fetchone()[0]
+            
+            rows = []
+            turn_numbers = []
+            session_users: Dict[str, str] = {}
+            for t, extracted in zip(turns, extracted_json):
+                session_id = t["session_id"]
+                next_turn[session_id] += 1
+                turn_numbers.append(next_turn[session_id])
+                session_users[session_id] = t["user_id"]
+                rows.append((
+                    session_id, t["user_id"], next_turn[session_id],
+                    t["user_message"], t.get("assistant_message"),
+                    t.get("intent"), t.get("intent_confidence"),
+                    extracted
+                ))
+            
+            cursor.executemany(_SQL_INSERT_TURN, rows)
+            
+            # 每个会话只更新一次元数据
+            cursor.executemany(_SQL_TOUCH_SESSION, [
+                (session_id, session_users[session_id], next_turn[session_id])
+                for session_id in session_users
+            ])
+        
+        for session_id in session_users:
+            self._invalidate_history(session_id)
+        return turn_numbers
+    
+    def add_turn_async(
+        self,
+        session_id: str,
+        user_id: str,
+        user_message: str,
+        assistant_message: str,
+        intent: str,
+        intent_confidence: float,
+        extracted_data: Optional[Dict[str, Any]] = None
+    ) -> Future:
+        """
+        把一轮对话交给后台写线程保存，立即返回
+        
+        Returns:
+            Future，完成时结果为轮次编号（写入失败时携带异常）
+        """
+        self._ensure_writer()
+        future: Future = Future()
+        self._write_queue.put(({
+            "session_id": session_id,
+            "user_id": user_id,
+            "user_message": user_message,
+            "assistant_message": assistant_message,
+            "intent": intent,
+            "intent_confidence": intent_confidence,
+            "extracted_data": extracted_data
+        }, future))
+        return future
+    
+    def flush(self):
+        """等待此前提交的异步写入全部完成"""
+        if self._writer is None:
+            return
+        barrier: Future = Future()
+        self._write_queue.put((None, barrier))
+        barrier.result()
+    
+    def _ensure_writer(self):
+        if self._writer is not None:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._writer_loop, name="lifeos-db-writer", daemon=True
+                )
+                self._writer.start()
+                atexit.register(self.flush)
+    
+    def _collect_writes(self) -> list:
+        """取出一批待写入项：阻塞等待第一项，之后最多再等 WRITE_BATCH_WAIT 秒"""
+        batch = [self._write_queue.get()]
+        deadline = time.monotonic() + WRITE_BATCH_WAIT
+        while len(batch) < WRITE_BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._write_queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _writer_loop(self):
+        while True:
+            batch = self._collect_writes()
+            turns = [(turn, future) for turn, future in batch if turn is not None]
+            if turns:
+                try:
+                    numbers = self.add_turns_bulk([turn for turn, _ in turns])
+                    for (_, future), number in zip(turns, numbers):
+                        future.set_result(number)
+                except Exception:
+                    # 整批失败时逐条重试，只让出错的那一轮携带异常
+                    for turn, future in turns:
+                        try:
+                            future.set_result(self.add_turn(**turn))
+                        except Exception as e:
+                            future.set_exception(e)
+            # 屏障项（flush）排在此前所有写入之后，批次提交完才放行
+            for turn, future in batch:
+                if turn is None:
+                    future.set_result(None)
     
     def get_conversation_history(
         self, 
         session_id: str, 
         last_n_turns: int = 5
     ) -> List[Dict[str, Any]]:
-        """获取对话历史"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT turn_number, user_message, assistant_message, intent, 
-                   intent_confidence, extracted_data, created_at
-            FROM conversations
-            WHERE session_id = ?
-            ORDER BY turn_number DESC
-            LIMIT ?
-        """, (session_id, last_n_turns))
+        """获取对话历史（最多返回 MAX_HISTORY_TURNS 轮）"""
+        last_n_turns = max(0, min(last_n_turns, MAX_HISTORY_TURNS))
+        # 缓存的是不可变的原始行，返回的字典每次新建，调用方修改不会影响缓存
+        cached = self._history_cache.get(session_id)
+        if cached is not None and cached[0] == last_n_turns:
+            return _history_from_rows(cached[1], cached[2])
         
+        version = self._history_versions.get(session_id, 0)
+        cursor = self._connect().cursor()
+        cursor.execute(_SQL_HISTORY, (session_id, last_n_turns))
+        cols = tuple(c[0] for c in cursor.description)
         rows = cursor.fetchall()
-        conn.close()
-        
-        # 转换为列表并反转（最早的在前）
-        history = []
-        for row in reversed(rows):
-            history.append({
-                "turn_number": row["turn_number"],
-                "user_message": row["user_message"],
-                "assistant_message": row["assistant_message"],
-                "intent": row["intent"],
-                "intent_confidence": row["intent_confidence"],
-                "extracted_data": json.loads(row["extracted_data"]) if row["extracted_data"] else None,
-                "created_at": row["created_at"]
-            })
-        
-        return history
+        
+        if self._history_versions.get(session_id, 0) == version:
+            self._history_cache.put(session_id, (last_n_turns, cols, rows))
+        return _history_from_rows(cols, rows)
+    
+    def archive_old_conversations(self, days: int = 90) -> int:
+        """
+        归档不活跃会话的对话记录
+        最后活跃时间早于 days 天前的会话，其全部轮次移入 conversations_archive
+        （按会话整体移动；会话记录保留，再次活跃时轮次编号接着归档前的继续）
+        
+        Returns:
+            归档的对话轮数
+        """
+        cutoff = f"-{int(days)} days"
+        stale_sessions = """
+            SELECT session_id FROM sessions
+            WHERE last_active_at < datetime('now', ?)
+        """
+        with self._transaction() as cursor:
+            cursor.execute(stale_sessions, (cutoff,))
+            archived_sessions = [row[0] for row in cursor.fetchall()]
+            cursor.execute(f"""
+                INSERT INTO conversations_archive ({_CONVERSATION_COLUMNS})
+                SELECT {_CONVERSATION_COLUMNS} FROM conversations
+                WHERE session_id IN ({stale_sessions})
+            """, (cutoff,))
+            cursor.execute(f"""
+                DELETE FROM conversations
+                WHERE session_id IN ({stale_sessions})
+            """, (cutoff,))
+            archived = cursor.rowcount
+        
+        # 与 add_turn 相同的版本化失效，避免并发读取把归档前的历史写回缓存
+        if archived:
+            for session_id in archived_sessions:
+                self._invalidate_history(session_id)
+        return archived
+    
+    def maintenance(self, archive_days: int = 90, vacuum: bool = False) -> int:
+        """
+        数据库维护：归档旧对话并更新查询规划统计信息
+        vacuum=True 时额外整理数据库文件（耗时较长，适合低峰期执行）
+        
+        Returns:
+            归档的对话轮数
+        """
+        archived = self.archive_old_conversations(archive_days)
+        conn = self._connect()
+        conn.execute("ANALYZE")
+        if vacuum:
+            conn.execute("VACUUM")
+        return archived
     
     def build_context_summary(self, history: List[Dict[str, Any]]) -> str:
         """构建对话上下文摘要"""
@@ -193,38 +568,26 @@ class ConversationManager:
     
     def get_session_stats(self, session_id: str) -> Dict[str, Any]:
         """获取会话统计信息"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT total_turns, started_at, last_active_at
-            FROM sessions
-            WHERE session_id = ?
-        """, (session_id,))
+        cursor = self._connect().cursor()
+        cursor.execute(_SQL_SESSION_INFO, (session_id,))
         
         row = cursor.fetchone()
         
         if not row:
-            conn.close()
             return {}
         
-        # 统计意图分布
-        cursor.execute("""
-            SELECT intent, COUNT(*) as count
-            FROM conversations
-            WHERE session_id = ?
-            GROUP BY intent
-        """, (session_id,))
+        user_id, total_turns, started_at, last_active_at = row
         
-        intent_distribution = {row[0]: row[1] for row in cursor.fetchall()}
+        # 统计意图分布
+        cursor.execute(_SQL_INTENT_DISTRIBUTION, (session_id,))
         
-        conn.close()
+        intent_distribution = {r[0]: r[1] for r in cursor.fetchall()}
         
         return {
-            "total_turns": row["total_turns"],
-            "started_at": row["started_at"],
-            "last_active_at": row["last_active_at"],
+            "user_id": user_id,
+            "total_turns": total_turns,
+            "started_at": started_at,
+            "last_active_at": last_active_at,
             "intent_distribution": intent_distribution
         }
     
@@ -235,19 +598,36 @@ class ConversationManager:
         limit: int = 3
     ) -> List[Dict[str, Any]]:
         """搜索相似对话（用于个性化推荐）"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = self._connect().cursor()
+        cursor.execute(_SQL_SIMILAR_CONVERSATIONS, (user_id, intent, limit))
         
-        cursor.execute("""
-            SELECT session_id, user_message, assistant_message, created_at
-            FROM conversations
-            WHERE user_id = ? AND intent = ?
-            ORDER BY created_at DESC
-            LIMIT ?
-        """, (user_id, intent, limit))
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        return [dict(row) for row in rows]
+        return _rows_to_dicts(cursor)
+    
+    # ------------------------------------------------------------------
+    # 异步接口：在线程池中执行同步方法，供 async 调用方（Web 接口）直接 await，
+    # 不阻塞事件循环；每个工作线程复用自己的常驻连接
+    # ------------------------------------------------------------------
+    
+    async def acreate_session(self, user_id: str, session_id: Optional[str] = None) -> str:
+        """create_session 的异步版本"""
+        return await asyncio.to_thread(self.create_session, user_id, session_id)
+    
+    async def aadd_turn(self, *args, **kwargs) -> int:
+        """add_turn 的异步版本"""
+        return await asyncio.to_thread(self.add_turn, *args, **kwargs)
+    
+    async def aflush(self):
+        """flush 的异步版本：等待排队中的写入提交，之后的读取能看到刚保存的轮次"""
+        await asyncio.to_thread(self.flush)
+    
+    async def aget_conversation_history(
+        self, 
+        session_id: str, 
+        last_n_turns: int = 5
+    ) -> List[Dict[str, Any]]:
+        """get_conversation_history 的异步版本"""
+        return await asyncio.to_thread(self.get_conversation_history, session_id, last_n_turns)
+    
+    async def aget_session_stats(self, session_id: str) -> Dict[str, Any]:
+        """get_session_stats 的异步版本"""
+        return await asyncio.to_thread(self.get_session_stats, session_id)
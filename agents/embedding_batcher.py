@@ -0,0 +1,62 @@
+"""
+句向量微批处理
+并发请求的编码在短时间窗口内合并为一次批量 encode，共享模型前向计算
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List
+
+
+class EmbeddingBatcher:
+    """
+    把单条编码请求攒成批次交给 encode_fn 处理（后台线程）
+    每批最多 max_batch 条，第一条请求到达后最多再等待 max_wait 秒
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], Any],
+        max_batch: int = 32,
+        max_wait: float = 0.01
+    ):
+        self.encode_fn = encode_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker = threading.Thread(
+            target=self._run, name="lifeos-embed-batcher", daemon=True
+        )
+        self._worker.start()
+
+    def embed(self, text: str) -> Any:
+        """编码单条文本（阻塞直到所在批次完成）"""
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future.result()
+
+    def _collect_batch(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            try:
+                embeddings = self.encode_fn([text for text, _ in batch])
+                for (_, future), emb in zip(batch, embeddings):
+                    future.set_result(emb)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
@@ -3,7 +3,6 @@
 使用腾讯云 SDK 正确调用混元 API
 """
 
-import json
 import os
 from typing import List, Dict, Any, Optional
 from tencentcloud.common import credential
@@ -12,6 +11,23 @@ from tencentcloud.common.profile.http_profile import HttpProfile
 from tencentcloud.hunyuan.v20230901 import hunyuan_client, models
 
 
+# LangChain 消息类型 → 混元角色
+_ROLE_MAPPING = {
+    'system': 'system',
+    'human': 'user',
+    'ai': 'assistant',
+    'user': 'user',
+    'assistant': 'assistant'
+}
+
+
+def _to_hunyuan_message(role: str, content: str) -> "models.Message":
+    message = models.Message()
+    message.Role = role
+    message.Content = content
+    return message
+
+
 class HunyuanLLM:
     """腾讯混元大模型封装"""
     
@@ -39,6 +55,9 @@ class HunyuanLLM:
         # 配置 HTTP 请求
         httpProfile = HttpProfile()
         httpProfile.endpoint = "hunyuan.tencentcloudapi.com"
+        httpProfile.reqTimeout = 60
+        # 复用 HTTP 长连接，避免每次调用都重新进行 TCP + TLS 握手
+        httpProfile.keepAlive = True
         
         # 创建客户端配置
         clientProfile = ClientProfile()
@@ -73,45 +92,28 @@ class HunyuanLLM:
                 # 检查是否是 LangChain 消息对象
                 if hasattr(msg, 'type') and hasattr(msg, 'content'):
                     # LangChain 消息对象
-                    role_mapping = {
-                        'system': 'system',
-                        'human': 'user',
-                        'ai': 'assistant',
-                        'user': 'user',
-                        'assistant': 'assistant'
-                    }
-                    role = role_mapping.get(msg.type, 'user')
+                    role = _ROLE_MAPPING.get(msg.type, 'user')
                     content = msg.content
                 else:
                     # 字典格式
                     role = msg.get("role", "user")
                     content = msg.get("content", "")
                 
-                formatted_msg = {
-                    "Role": role,
-                    "Content": content
-                }
-                formatted_messages.append(formatted_msg)
+                formatted_messages.append(_to_hunyuan_message(role, content))
             
-            # 创建请求
+            # 直接设置请求字段，不经过 JSON 序列化再由 SDK 反解析
             req = models.ChatCompletionsRequest()
-            params = {
-                "Model": self.model,
-                "Messages": formatted_messages,
-                "Temperature": temperature,
-                "TopP": top_p
-            }
-            req.from_json_string(json.dumps(params))
+            req.Model = self.model
+            req.Messages = formatted_messages
+            req.Temperature = temperature
+            req.TopP = top_p
             
             # 发送请求
             resp = self.client.ChatCompletions(req)
             
-            # 解析响应
-            response_dict = json.loads(resp.to_json_string())
-            
-            # 提取回复内容
-            if "Choices" in response_dict and len(response_dict["Choices"]) > 0:
-                return response_dict["Choices"][0]["Message"]["Content"]
+            # 提取回复内容（直接读取响应对象，不再转成 JSON 字符串再解析）
+            if resp.Choices:
+                return resp.Choices[0].Message.Content
             else:
                 return "抱歉，我暂时无法回答。"
                 
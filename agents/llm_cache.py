@@ -0,0 +1,35 @@
+"""
+LLM 回复缓存
+为闲聊等高频、低差异的对话缓存 LLM 回复，避免重复的网络调用
+"""
+
+import hashlib
+from typing import Dict, List, Optional
+
+from modules.ttl_cache import TTLLRUCache
+
+
+# 闲聊回复缓存：1 小时过期，限制人设/提示词调整后旧回复的存活时间
+_casual_cache = TTLLRUCache(maxsize=2048, ttl=3600)
+
+
+def make_casual_key(user_input: str, history: List[Dict]) -> str:
+    """生成闲聊缓存键：规范化的用户输入 + 最近 3 轮对话的哈希"""
+    digest = hashlib.blake2b(digest_size=8)
+    for turn in history[-3:]:
+        digest.update((turn.get('user_message') or '').encode('utf-8'))
+        digest.update(b'\x00')
+        digest.update((turn.get('assistant_message') or '').encode('utf-8'))
+        digest.update(b'\x01')
+    return f"{user_input.strip().lower()}|{digest.hexdigest()}"
+
+
+def get_cached_casual(key: str) -> Optional[str]:
+    """读取闲聊回复缓存，未命中返回 None"""
+    return _casual_cache.get(key)
+
+
+def put_cached_casual(key: str, value: str):
+    """写入闲聊回复缓存"""
+    if value:
+        _casual_cache.put(key, value)
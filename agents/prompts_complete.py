@@ -1,6 +1,9 @@
 ﻿"""
 完整意图识别 Prompt
 支持 6 种核心意图 + 多轮对话理解
+
+约定：system 消息只放静态内容，对话历史、用户输入等动态变量一律放在 human 消息中，
+保证每次请求的 system 前缀完全一致，便于模型服务端的前缀缓存命中
 """
 
 from langchain_core.prompts import ChatPromptTemplate
@@ -251,8 +254,7 @@ category 必须是以下四类之一：
     "total_count": 0
 }}
 
-请从以下用户输入中提取任务，不得编造：
-{user_input}
+请从用户输入中提取任务，不得编造。
 """),
 ("human", "{user_input}")
 ])
@@ -527,14 +529,15 @@ goal_planning_prompt = ChatPromptTemplate.from_messages([
 }}
 
 ----------------------------------------
-# 📌 对话历史
-{conversation_summary}
-
 请根据对话历史和用户输入判断：
 - 是否为延续性提问（格式A）
 - 或是否为新的目标规划（格式B）
 """),
-("human", "{user_input}")
+("human", """# 📌 对话历史
+{conversation_summary}
+
+# 用户输入
+{user_input}""")
 ])
 
 
@@ -606,3 +609,27 @@ reflection_prompt = ChatPromptTemplate.from_messages([
 请生成反思总结：
 """)
 ])
+
+
+# =============================================================================
+# 闲聊回应
+# =============================================================================
+
+casual_chat_prompt = ChatPromptTemplate.from_messages([
+    ("system", """你是 LifeOS 智能助理，一个温暖、专业、富有同理心的生活助手。
+
+你的特点：
+- 友善亲切，像朋友一样交流
+- 善于倾听，理解用户情绪
+- 适当使用 emoji 让对话更生动（但不过度）
+- 回复简洁明了，不啰嗦
+- 能够记住对话上下文，提供连贯回复
+
+根据用户的输入，生成温暖、自然、贴合上下文的回应。"""),
+    ("human", """对话历史：
+{history_text}
+
+用户当前输入：{user_input}
+
+请生成一个友好、自然的回应。""")
+])
@@ -0,0 +1,145 @@
+"""
+语义回复缓存
+用句向量相似度匹配相近的闲聊输入（如"你好啊"/"你好呀"），命中时直接复用已有回复
+依赖 sentence-transformers 和 numpy，未安装时自动禁用
+"""
+
+import os
+import threading
+from typing import List, Optional, Tuple
+
+from agents.embedding_batcher import EmbeddingBatcher
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_CACHE_AVAILABLE = True
+except ImportError:
+    SEMANTIC_CACHE_AVAILABLE = False
+
+
+DEFAULT_MODEL_NAME = "BAAI/bge-small-zh-v1.5"
+DEFAULT_THRESHOLD = 0.92
+DEFAULT_CACHE_FILE = "lifeos_cache.npz"
+
+
+class SemanticCache:
+    """
+    基于余弦相似度的回复缓存
+    向量均已归一化，相似度即矩阵与查询向量的点积
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL_NAME,
+        threshold: float = DEFAULT_THRESHOLD,
+        max_entries: int = 4096,
+        cache_file: Optional[str] = DEFAULT_CACHE_FILE
+    ):
+        if not SEMANTIC_CACHE_AVAILABLE:
+            raise ImportError("请安装 sentence-transformers 和 numpy 以启用语义缓存")
+
+        self.model = SentenceTransformer(model_name)
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self._matrix = np.zeros(
+            (0, self.model.get_sentence_embedding_dimension()), dtype=np.float32
+        )
+        self._inputs: List[str] = []
+        self._responses: List[str] = []
+        # 并发请求的编码合并成批次，一次 encode 处理多条输入
+        self._batcher = EmbeddingBatcher(
+            lambda texts: self.model.encode(
+                texts, normalize_embeddings=True, batch_size=32
+            ).astype(np.float32)
+        )
+
+        if cache_file and os.path.exists(cache_file):
+            self.load(cache_file)
+
+    def _encode(self, text: str) -> "np.ndarray":
+        return self._batcher.embed(text)
+
+    def lookup(self, text: str) -> Tuple[Optional[str], Optional["np.ndarray"]]:
+        """
+        查找语义相近的已缓存回复
+        返回 (回复, 查询向量)，未命中时回复为 None；查询向量可传给 add() 避免重复编码
+        """
+        text = text.strip().lower()
+        if not text or not self._responses:
+            return None, None
+        query = self._encode(text)
+        with self._lock:
+            if not self._responses:
+                return None, query
+            scores = self._matrix @ query
+            idx = int(scores.argmax())
+            if scores[idx] > self.threshold:
+                return self._responses[idx], query
+        return None, query
+
+    def add(self, text: str, response: str, embedding: Optional["np.ndarray"] = None):
+        """
+        加入一条 输入→回复 缓存，超过容量时丢弃最早的条目
+        embedding 为 lookup() 返回的查询向量，未提供时重新编码
+        """
+        text = text.strip().lower()
+        if not text or not response:
+            return
+        emb = embedding if embedding is not None else self._encode(text)
+        with self._lock:
+            self._matrix = np.vstack([self._matrix, emb[None, :]])[-self.max_entries:]
+            self._inputs = (self._inputs + [text])[-self.max_entries:]
+            self._responses = (self._responses + [response])[-self.max_entries:]
+
+    def save(self, path: Optional[str] = None):
+        """保存到 .npz 文件"""
+        path = path or self.cache_file
+        if not path:
+            return
+        with self._lock:
+            np.savez(
+                path,
+                embeddings=self._matrix,
+                inputs=np.array(self._inputs, dtype=object),
+                responses=np.array(self._responses, dtype=object)
+            )
+
+    def load(self, path: str):
+        """从 .npz 文件加载（向量维度不一致时忽略）"""
+        try:
+            data = np.load(path, allow_pickle=True)
+            matrix = data["embeddings"].astype(np.float32)
+            if matrix.shape[1:] != self._matrix.shape[1:]:
+                print(f"⚠️ 语义缓存维度不匹配，忽略: {path}")
+                return
+            with self._lock:
+                self._matrix = matrix
+                self._inputs = [str(x) for x in data["inputs"]]
+                self._responses = [str(x) for x in data["responses"]]
+        except Exception as e:
+            print(f"⚠️ 语义缓存加载失败: {e}")
+
+
+def create_semantic_cache() -> Optional[SemanticCache]:
+    """
+    根据环境变量创建语义缓存（默认关闭）
+    SEMANTIC_CACHE_ENABLED=true 开启，SEMANTIC_CACHE_MODEL / SEMANTIC_CACHE_THRESHOLD 可选
+    """
+    if os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() not in ("1", "true", "yes"):
+        return None
+    if not SEMANTIC_CACHE_AVAILABLE:
+        print("⚠️ 未安装 sentence-transformers，语义缓存不可用")
+        return None
+    try:
+        cache = SemanticCache(
+            model_name=os.getenv("SEMANTIC_CACHE_MODEL", DEFAULT_MODEL_NAME),
+            threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", DEFAULT_THRESHOLD))
+        )
+        print(f"✅ 语义缓存已启用 (已有 {len(cache._responses)} 条)")
+        return cache
+    except Exception as e:
+        print(f"⚠️ 语义缓存初始化失败: {e}")
+        return None
@@ -84,6 +84,8 @@ class AgentState(TypedDict, total=False):
     # 多轮对话
     session_id: str
     conversation_history: List[Dict]
+    conversation_summary: str  # 对话上下文摘要（意图识别时生成，下游节点复用）
+    historical_data: str  # 最近任务/目标等历史数据（供反思节点使用）
     
     # 元数据
     processing_steps: Annotated[List[str], operator.add]  # 记录处理步骤
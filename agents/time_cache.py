@@ -0,0 +1,27 @@
+"""
+时间戳缓存
+同一秒内重复获取 ISO 时间字符串时直接复用，避免每次请求都构造 datetime 并格式化
+"""
+
+import time
+from datetime import datetime
+
+_cached_sec = -1
+_cached_iso = ""
+
+
+def now_iso_cached() -> str:
+    """返回当前时间的 ISO 字符串（秒级精度，每秒最多格式化一次）"""
+    global _cached_sec, _cached_iso
+    now = time.time()
+    sec = int(now)
+    if sec != _cached_sec:
+        # 先算好字符串再更新秒数，多线程下最坏情况只是重复格式化一次
+        _cached_iso = datetime.fromtimestamp(sec).isoformat()
+        _cached_sec = sec
+    return _cached_iso
+
+
+def today_iso_cached() -> str:
+    """返回今天的日期字符串 YYYY-MM-DD（复用秒级缓存，跨零点自动更新）"""
+    return now_iso_cached()[:10]
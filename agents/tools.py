@@ -8,11 +8,60 @@ from langchain_core.tools import BaseTool
 from langchain_core.callbacks import CallbackManagerForToolRun
 from pydantic import BaseModel, Field
 import json
-from datetime import datetime
 
 from modules.memory import MemoryManager, MemoryStore
 
 
+# =============================================================================
+# 关键词规则（模块加载时构建一次）：按优先级排列的 (取值, 关键词集合)
+# =============================================================================
+
+_URGENCY_RULES = (
+    (9, frozenset({'明天', '今天', '马上', '立即', '紧急'})),
+    (7, frozenset({'本周', '这周', '近期'})),
+    (5, frozenset({'下周', '月底'})),
+)
+
+_IMPORTANCE_RULES = (
+    (8, frozenset({'报告', '项目', '会议', '客户', '考试'})),
+    (5, frozenset({'邮件', '回复', '查看'})),
+)
+
+_CATEGORY_RULES = (
+    ('work', frozenset({'工作', '项目', '会议', '报告', '客户'})),
+    ('learning', frozenset({'学习', '学', '练习', '教程'})),
+    ('health', frozenset({'运动', '健身', '健康'})),
+)
+
+_ESTIMATE_RULES = (
+    (60, frozenset({'写', '做', '完成', '准备'})),
+    (10, frozenset({'回复', '查看', '确认'})),
+    (120, frozenset({'报告', '文档', '方案'})),
+)
+
+_VIP_WORDS = frozenset({'客户', '老板', '领导'})
+_URGENT_WORDS = frozenset({'紧急', '马上', '立即'})
+_DOCUMENT_WORDS = frozenset({'报告', '文档', '方案', '策划'})
+_QUICK_REPLY_WORDS = frozenset({'邮件', '回复', '确认'})
+_MEETING_WORDS = frozenset({'会议', '讨论'})
+
+# 按复杂度的基础耗时（分钟）
+_BASE_MINUTES = {'simple': 15, 'medium': 45, 'complex': 120}
+
+
+def _contains_any(text: str, words: frozenset) -> bool:
+    """文本是否包含任一关键词（中文按子串匹配）"""
+    return any(word in text for word in words)
+
+
+def _match_rules(text: str, rules: tuple, default: Any) -> Any:
+    """返回第一条命中规则的取值，均未命中时返回默认值"""
+    for value, words in rules:
+        if _contains_any(text, words):
+            return value
+    return default
+
+
 # =============================================================================
 # 工具输入模型
 # =============================================================================
@@ -79,46 +128,21 @@ class TaskAnalysisTool(BaseTool):
         """执行任务分析"""
         analyzed_tasks = []
         
-        current_time = datetime.now()
-        current_hour = current_time.hour
-        
         for task_desc in tasks:
             # 基于规则的初步分析
             task_lower = task_desc.lower()
             
-            # 判断紧急性
-            urgency = 5  # 默认
-            if any(word in task_lower for word in ['明天', '今天', '马上', '立即', '紧急']):
-                urgency = 9
-            elif any(word in task_lower for word in ['本周', '这周', '近期']):
-                urgency = 7
-            elif any(word in task_lower for word in ['下周', '月底']):
-                urgency = 5
+            # 判断紧急性（默认 5）
+            urgency = _match_rules(task_lower, _URGENCY_RULES, 5)
             
-            # 判断重要性
-            importance = 6  # 默认
-            if any(word in task_lower for word in ['报告', '项目', '会议', '客户', '考试']):
-                importance = 8
-            elif any(word in task_lower for word in ['邮件', '回复', '查看']):
-                importance = 5
+            # 判断重要性（默认 6）
+            importance = _match_rules(task_lower, _IMPORTANCE_RULES, 6)
             
             # 判断类别
-            category = 'personal'
-            if any(word in task_lower for word in ['工作', '项目', '会议', '报告', '客户']):
-                category = 'work'
-            elif any(word in task_lower for word in ['学习', '学', '练习', '教程']):
-                category = 'learning'
-            elif any(word in task_lower for word in ['运动', '健身', '健康']):
-                category = 'health'
+            category = _match_rules(task_lower, _CATEGORY_RULES, 'personal')
             
-            # 估算时间
-            estimated_minutes = 30  # 默认
-            if any(word in task_lower for word in ['写', '做', '完成', '准备']):
-                estimated_minutes = 60
-            elif any(word in task_lower for word in ['回复', '查看', '确认']):
-                estimated_minutes = 10
-            elif any(word in task_lower for word in ['报告', '文档', '方案']):
-                estimated_minutes = 120
+            # 估算时间（默认 30 分钟）
+            estimated_minutes = _match_rules(task_lower, _ESTIMATE_RULES, 30)
             
             # 是否可延后
             can_defer = urgency < 7 and importance < 7
@@ -184,9 +208,9 @@ class PriorityAssessmentTool(BaseTool):
         
         # 任务关键词加权
         task_lower = task.lower()
-        if any(word in task_lower for word in ['客户', '老板', '领导']):
+        if _contains_any(task_lower, _VIP_WORDS):
             score += 1
-        if any(word in task_lower for word in ['紧急', '马上', '立即']):
+        if _contains_any(task_lower, _URGENT_WORDS):
             score += 2
         
         score = min(10, max(1, int(score)))
@@ -225,18 +249,14 @@ class TimeEstimationTool(BaseTool):
         task_lower = task.lower()
         
         # 基础时间
-        base_time = {
-            'simple': 15,
-            'medium': 45,
-            'complex': 120
-        }.get(complexity, 45)
+        base_time = _BASE_MINUTES.get(complexity, 45)
         
         # 根据关键词调整
-        if any(word in task_lower for word in ['报告', '文档', '方案', '策划']):
+        if _contains_any(task_lower, _DOCUMENT_WORDS):
             base_time = max(base_time, 90)
-        elif any(word in task_lower for word in ['邮件', '回复', '确认']):
+        elif _contains_any(task_lower, _QUICK_REPLY_WORDS):
             base_time = min(base_time, 15)
-        elif any(word in task_lower for word in ['会议', '讨论']):
+        elif _contains_any(task_lower, _MEETING_WORDS):
             base_time = 60
         
         # 生成拆解建议
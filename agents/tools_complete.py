@@ -7,10 +7,10 @@ from langchain_core.tools import BaseTool
 from langchain_core.callbacks import CallbackManagerForToolRun
 from pydantic import BaseModel, Field
 import json
-from datetime import datetime, timedelta
 
 from modules.memory import MemoryManager, MemoryStore
 from agents.conversation_manager import ConversationManager
+from agents.time_cache import today_iso_cached
 
 
 # =============================================================================
@@ -140,7 +140,7 @@ class HabitTrackingTool(BaseTool):
                     return json.dumps({"error": "习惯不存在"}, ensure_ascii=False)
                 
                 habit_id = habit[0]
-                today = datetime.now().date()
+                today = today_iso_cached()
                 
                 cursor.execute("""
                     INSERT OR IGNORE INTO habit_checkins (habit_id, checkin_date)
@@ -182,7 +182,7 @@ class HabitTrackingTool(BaseTool):
                     "target": row[1],
                     "total_checkins": row[2],
                     "last_checkin": row[3],
-                    "status": "活跃" if row[3] == str(datetime.now().date()) else "待打卡"
+                    "status": "活跃" if row[3] == today_iso_cached() else "待打卡"
                 }, ensure_ascii=False)
             
             else:  # query
@@ -259,6 +259,12 @@ class GoalManagementTool(BaseTool):
             )
         """)
         
+        # 按用户查询进行中的目标（查询和统计都按 user_id + status 过滤）
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_goals_user_status
+            ON goals(user_id, status)
+        """)
+        
         conn.commit()
         conn.close()
     
@@ -369,6 +375,12 @@ class ReflectionTool(BaseTool):
             )
         """)
         
+        # 按用户取最近的反思记录
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_reflections_user_created
+            ON reflections(user_id, created_at DESC)
+        """)
+        
         conn.commit()
         conn.close()
     
@@ -471,8 +483,10 @@ class DataStatsTool(BaseTool):
                         AND hc.checkin_date >= {time_filter}
                     WHERE h.user_id = ?
                     GROUP BY h.id
+                    ORDER BY checkins DESC
                 """, (user_id,))
                 
+                # 已在 SQL 中按打卡次数降序排列，第一条即坚持最好的习惯
                 habits = cursor.fetchall()
                 return json.dumps({
                     "period": time_range,
@@ -484,12 +498,13 @@ class DataStatsTool(BaseTool):
                 }, ensure_ascii=False)
             
             elif stat_type == "overall":
-                # 综合统计
-                cursor.execute("SELECT COUNT(*) FROM habits WHERE user_id = ?", (user_id,))
-                total_habits = cursor.fetchone()[0]
-                
-                cursor.execute("SELECT COUNT(*) FROM goals WHERE user_id = ? AND status = 'active'", (user_id,))
-                active_goals = cursor.fetchone()[0]
+                # 综合统计（一次查询同时取回习惯数和进行中的目标数）
+                cursor.execute("""
+                    SELECT
+                        (SELECT COUNT(*) FROM habits WHERE user_id = ?),
+                        (SELECT COUNT(*) FROM goals WHERE user_id = ? AND status = 'active')
+                """, (user_id, user_id))
+                total_habits, active_goals = cursor.fetchone()
                 
                 return json.dumps({
                     "summary": {
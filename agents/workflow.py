@@ -5,6 +5,7 @@ LangGraph 工作流 - 完整的智能体执行流程
 
 import json
 import os
+import re
 from typing import Dict, Any, List
 from datetime import datetime
 
@@ -25,6 +26,10 @@ from .prompts import (
 from .tools import get_all_tools
 
 
+# Mock 模式拆分任务时去掉行首序号（如 "1. " "2) " "3、"）
+_LIST_NUMBER_RE = re.compile(r'^\d+[\.\)、]?\s*')
+
+
 class LifeOSWorkflow:
     """
     LifeOS 完整工作流
@@ -199,8 +204,7 @@ class LifeOSWorkflow:
                 line = line.strip()
                 if line and any(char.isalnum() for char in line):
                     # 移除数字序号
-                    import re
-                    cleaned = re.sub(r'^\d+[\.\)、]?\s*', '', line)
+                    cleaned = _LIST_NUMBER_RE.sub('', line)
                     if cleaned:
                         tasks.append(cleaned)
         
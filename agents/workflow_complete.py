@@ -3,14 +3,24 @@
 修复：确保所有 prompt 都被正确使用
 """
 
+import asyncio
+import atexit
 import json
+import logging
+import operator
 import os
-from typing import Dict, Any, List, Optional, Union
-from datetime import datetime
+import re
+import threading
+import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from functools import lru_cache
+from typing import Dict, Any, Iterator, List, Optional, Union
 
 from langgraph.graph import StateGraph, END
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+from langchain_core.runnables import RunnableConfig
 
 from agents.state import AgentState
 from agents.prompts_complete import (
@@ -20,20 +30,155 @@ from agents.prompts_complete import (
     emotion_support_prompt,
     habit_management_prompt,
     goal_planning_prompt,
-    reflection_prompt
+    reflection_prompt,
+    casual_chat_prompt
 )
 from agents.tools_complete import get_complete_tools
 from agents.conversation_manager import ConversationManager
+from agents.llm_cache import make_casual_key, get_cached_casual, put_cached_casual
+from agents.semantic_cache import create_semantic_cache
+from agents.time_cache import now_iso_cached
 
 # 尝试导入腾讯混元
 try:
-    from agents.hunyuan_llm import HunyuanLLM
+    from agents.hunyuan_llm import HunyuanLLM, create_hunyuan_llm
     HUNYUAN_AVAILABLE = True
 except ImportError:
+    HunyuanLLM = create_hunyuan_llm = None
     HUNYUAN_AVAILABLE = False
     print("⚠️ 腾讯云 SDK 未安装，无法使用混元模型")
 
 
+# 每轮对话的节点跟踪用 DEBUG 级别，生产环境（INFO 及以上）不会格式化这些消息
+logger = logging.getLogger("lifeos.workflow")
+
+
+# LLM 返回的 JSON 可能包裹在 ```json 代码块中，直接取第一个 { 到最后一个 } 之间的内容
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+
+def _compile_keyword_rules(rules) -> tuple:
+    """
+    将 ((类别, {关键词...}), ...) 编译为一个正则和 关键词→类别 映射
+    使用前瞻分组，一次扫描即可找出所有（包括重叠的）关键词命中
+    """
+    word_to_category = {}
+    for category, words in rules:
+        for word in words:
+            word_to_category.setdefault(word, category)
+    alternation = "|".join(
+        re.escape(w) for w in sorted(word_to_category, key=len, reverse=True)
+    )
+    return re.compile(f"(?=({alternation}))"), word_to_category
+
+
+def _match_keyword_categories(pattern: "re.Pattern", word_to_category: Dict[str, str], text: str) -> set:
+    """返回文本中命中的所有关键词类别"""
+    return {word_to_category[m.group(1)] for m in pattern.finditer(text)}
+
+
+# 规则降级意图识别：按优先级排列的 (意图, 关键词) 规则
+_FALLBACK_INTENT_RULES = (
+    ("habit_tracking", frozenset({'习惯', '坚持', '打卡'})),
+    ("goal_setting", frozenset({'目标', '想要', '计划', '实现', '学习'})),
+    ("reflection", frozenset({'总结', '反思', '回顾', '复盘'})),
+    ("emotion_support", frozenset({'累', '焦虑', '压力', '崩溃', '疲惫'})),
+    ("task_management", frozenset({'任务', '要做', '整理', '待办', '安排'})),
+)
+_FALLBACK_INTENT_RE, _FALLBACK_WORD_INTENT = _compile_keyword_rules(_FALLBACK_INTENT_RULES)
+
+# 闲聊降级回复：按优先级排列的 (类别, 关键词) 规则
+_CASUAL_KEYWORD_RULES = (
+    ("greeting", frozenset({'你好', 'hi', 'hello', '嗨'})),
+    ("capability", frozenset({'功能', '能做', '可以做', '帮我'})),
+    ("thanks", frozenset({'谢谢', '感谢', 'thanks', 'thx'})),
+    ("goodbye", frozenset({'再见', 'bye', '拜拜'})),
+)
+_CASUAL_KEYWORD_RE, _CASUAL_WORD_CATEGORY = _compile_keyword_rules(_CASUAL_KEYWORD_RULES)
+
+_CASUAL_RESPONSES = {
+    "greeting": "你好！我是 LifeOS 智能助理 😊\n\n我可以帮你：\n• 📋 管理任务和待办\n• 🎯 追踪习惯打卡\n• 🌟 设定和拆解目标\n• 📝 记录反思总结\n• 💚 提供情绪支持\n\n有什么可以帮到你的吗？",
+    "capability": "我有这些能力：\n\n1. 📋 **任务管理**：整理待办，智能排序\n2. 🎯 **习惯追踪**：打卡记录，数据统计\n3. 🌟 **目标规划**：拆解目标，制定计划\n4. 📝 **反思总结**：定期回顾，持续改进\n5. 💚 **情绪支持**：倾听理解，温暖陪伴\n\n试试告诉我你现在想做什么吧！",
+    "thanks": "不客气！😊 很高兴能帮到你。\n\n有其他需要随时告诉我哦！",
+    "goodbye": "再见！👋 记得随时回来找我，我会一直在这里支持你！",
+}
+_CASUAL_DEFAULT_RESPONSE = "我在呢！😊 有什么可以帮你的吗？\n\n你可以告诉我你的任务、目标，或者只是聊聊天也可以~"
+
+
+# 任务优先级的排序权重、图标和文字（LLM 返回的 priority 统一转小写后查表）
+_PRIORITY_ORDER = {'high': 1, 'medium': 2, 'low': 3, '': 4}
+_PRIORITY_ICONS = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}
+_PRIORITY_LABELS = {'high': '高优先级', 'medium': '中优先级', 'low': '低优先级'}
+
+
+# 根据意图路由：意图识别节点的两个分支都会写入 intent，直接取值即可
+_route_by_intent = operator.itemgetter("intent")
+
+
+def _bind_method(method_name: str):
+    """生成图节点函数：从运行配置中取出工作流实例并调用其同名方法"""
+    def call(state: AgentState, config: RunnableConfig):
+        return getattr(config["configurable"]["workflow"], method_name)(state)
+    call.__name__ = method_name
+    return call
+
+
+@lru_cache(maxsize=1)
+def _compiled_workflow():
+    """构建并编译完整工作流图（进程内只执行一次，所有实例共享）"""
+    workflow = StateGraph(AgentState)
+    
+    # 添加所有节点
+    workflow.add_node("intent_recognition", _bind_method("_intent_recognition_node"))
+    workflow.add_node("task_processing", _bind_method("_task_processing_node"))
+    workflow.add_node("emotion_support", _bind_method("_emotion_support_node"))
+    workflow.add_node("habit_management", _bind_method("_habit_management_node"))
+    workflow.add_node("goal_planning", _bind_method("_goal_planning_node"))
+    workflow.add_node("reflection_guide", _bind_method("_reflection_guide_node"))
+    workflow.add_node("casual_response", _bind_method("_casual_response_node"))
+    workflow.add_node("personalization", _bind_method("_personalization_node"))  # ← 新增节点
+    workflow.add_node("output_generation", _bind_method("_output_generation_node"))
+    
+    # 设置入口
+    workflow.set_entry_point("intent_recognition")
+    
+    # 条件路由
+    workflow.add_conditional_edges(
+        "intent_recognition",
+        _route_by_intent,
+        {
+            "task_management": "task_processing",
+            "emotion_support": "emotion_support",
+            "habit_tracking": "habit_management",
+            "goal_setting": "goal_planning",
+            "reflection": "reflection_guide",
+            "casual_chat": "casual_response"
+        }
+    )
+    
+    # 任务处理后可选择性进行个性化增强
+    workflow.add_conditional_edges(
+        "task_processing",
+        _bind_method("_should_personalize"),
+        {
+            "personalize": "personalization",
+            "skip": "output_generation"
+        }
+    )
+    
+    # 个性化后到输出
+    workflow.add_edge("personalization", "output_generation")
+    
+    # 其他路径直接到输出
+    for node in ["emotion_support", "habit_management",
+                 "goal_planning", "reflection_guide", "casual_response"]:
+        workflow.add_edge(node, "output_generation")
+    
+    workflow.add_edge("output_generation", END)
+    
+    return workflow.compile()
+
+
 class CompleteLifeOSWorkflow:
     """
     完整 LifeOS 智能体工作流
@@ -49,61 +194,19 @@ class CompleteLifeOSWorkflow:
         self.db_path = db_path
         self.tools = get_complete_tools(db_path)
         self.conversation_manager = ConversationManager(db_path) if enable_conversation_memory else None
-        self.workflow_app = self._build_workflow()
-    
-    def _build_workflow(self) -> StateGraph:
-        """构建完整工作流图"""
-        workflow = StateGraph(AgentState)
-        
-        # 添加所有节点
-        workflow.add_node("intent_recognition", self._intent_recognition_node)
-        workflow.add_node("task_processing", self._task_processing_node)
-        workflow.add_node("emotion_support", self._emotion_support_node)
-        workflow.add_node("habit_management", self._habit_management_node)
-        workflow.add_node("goal_planning", self._goal_planning_node)
-        workflow.add_node("reflection_guide", self._reflection_guide_node)
-        workflow.add_node("casual_response", self._casual_response_node)
-        workflow.add_node("personalization", self._personalization_node)  # ← 新增节点
-        workflow.add_node("output_generation", self._output_generation_node)
-        
-        # 设置入口
-        workflow.set_entry_point("intent_recognition")
-        
-        # 条件路由
-        workflow.add_conditional_edges(
-            "intent_recognition",
-            self._route_by_intent,
-            {
-                "task_management": "task_processing",
-                "emotion_support": "emotion_support",
-                "habit_tracking": "habit_management",
-                "goal_setting": "goal_planning",
-                "reflection": "reflection_guide",
-                "casual_chat": "casual_response"
-            }
+        # 意图识别等待 LLM 时，在后台线程准备后续节点需要的上下文数据
+        self._prep_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="lifeos-prep")
+        # 对话持久化交给对话管理器的后台写线程，不占用回复的关键路径
+        self._pending_writes: Dict[str, Future] = {}
+        self._pending_lock = threading.Lock()
+        # 语义缓存（可选，SEMANTIC_CACHE_ENABLED=true 时启用），退出时落盘
+        self.semantic_cache = create_semantic_cache() if llm else None
+        if self.semantic_cache:
+            atexit.register(self.semantic_cache.save)
+        # 图结构与实例无关，全局只编译一次；节点通过 config 找到当前实例
+        self.workflow_app = _compiled_workflow().with_config(
+            configurable={"workflow": self}
         )
-        
-        # 任务处理后可选择性进行个性化增强
-        workflow.add_conditional_edges(
-            "task_processing",
-            self._should_personalize,
-            {
-                "personalize": "personalization",
-                "skip": "output_generation"
-            }
-        )
-        
-        # 个性化后到输出
-        workflow.add_edge("personalization", "output_generation")
-        
-        # 其他路径直接到输出
-        for node in ["emotion_support", "habit_management",
-                     "goal_planning", "reflection_guide", "casual_response"]:
-            workflow.add_edge(node, "output_generation")
-        
-        workflow.add_edge("output_generation", END)
-        
-        return workflow.compile()
     
     def _should_personalize(self, state: AgentState) -> str:
         """判断是否需要个性化增强"""
@@ -113,29 +216,26 @@ class CompleteLifeOSWorkflow:
             return "personalize"
         return "skip"
     
+    def _invoke_llm(self, prompt: List) -> Any:
+        """调用 LLM，并在服务端返回前缀缓存命中信息时记录日志"""
+        response = self.llm.invoke(prompt)
+        usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+        cached_tokens = (usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+        if cached_tokens:
+            logger.debug("⚡ 前缀缓存命中: %s/%s tokens", cached_tokens, usage.get('prompt_tokens', '?'))
+        return response
+    
     def _parse_json_response(self, content: str) -> Dict[str, Any]:
         """解析 JSON 响应（改进版，处理 Markdown 代码块）"""
         try:
-            # 移除可能的 Markdown 代码块标记
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
-            
-            # 尝试提取 JSON
-            start = content.find('{')
-            end = content.rfind('}') + 1
-            if start >= 0 and end > start:
-                json_str = content[start:end]
-                return json.loads(json_str)
+            # 一次正则匹配提取 JSON，代码块标记自然落在匹配范围之外
+            match = _JSON_OBJECT_RE.search(content)
+            if match:
+                return json.loads(match.group(0))
             return {}
         except Exception as e:
-            print(f"   ⚠️ JSON 解析失败: {e}")
-            print(f"   📄 原始内容: {content[:200]}...")
+            logger.warning("⚠️ JSON 解析失败: %s", e)
+            logger.debug("📄 原始内容: %s...", content[:200])
             return {}
     
     def _build_conversation_summary(self, history: List[Dict]) -> str:
@@ -160,15 +260,41 @@ class CompleteLifeOSWorkflow:
         
         return "\n".join(summary)
     
+    def _build_historical_data(self, history: List[Dict]) -> str:
+        """从最近的对话中提取任务、目标等历史数据（用于反思）"""
+        if not history:
+            return ""
+        
+        # 提取最近的任务、目标等信息
+        recent_tasks = []
+        recent_goals = []
+        for turn in history[-5:]:
+            if turn.get('intent') == 'task_management':
+                extracted = turn.get('extracted_data') or {}
+                tasks = extracted.get('tasks', []) if isinstance(extracted, dict) else []
+                recent_tasks.extend([t.get('title', '') for t in tasks[:3] if isinstance(t, dict)])
+            elif turn.get('intent') == 'goal_setting':
+                recent_goals.append(turn.get('user_message', '')[:50])
+        
+        historical_data = ""
+        if recent_tasks or recent_goals:
+            historical_data = "最近活动:\n"
+            if recent_tasks:
+                historical_data += f"任务: {', '.join(recent_tasks[:5])}\n"
+            if recent_goals:
+                historical_data += f"目标: {', '.join(recent_goals[:3])}"
+        return historical_data
+    
     def _extract_user_profile(self, conversation_history: List[Dict]) -> str:
         """从对话历史中提取用户画像（用于个性化）"""
         if not conversation_history:
             return "暂无用户画像数据"
         
-        # 简单提取：统计用户的行为偏好
-        task_count = sum(1 for h in conversation_history if h.get('intent') == 'task_management')
-        emotion_count = sum(1 for h in conversation_history if h.get('intent') == 'emotion_support')
-        goal_count = sum(1 for h in conversation_history if h.get('intent') == 'goal_setting')
+        # 简单提取：统计用户的行为偏好（一次遍历统计所有意图）
+        intent_counts = Counter(h.get('intent') for h in conversation_history)
+        task_count = intent_counts['task_management']
+        emotion_count = intent_counts['emotion_support']
+        goal_count = intent_counts['goal_setting']
         
         profile = []
         if task_count > 2:
@@ -186,7 +312,7 @@ class CompleteLifeOSWorkflow:
     
     def _intent_recognition_node(self, state: AgentState) -> Dict:
         """意图识别节点 - 使用 complete_intent_recognition_prompt"""
-        print("🔍 [意图识别] 调用 LLM 分析...")
+        logger.debug("🔍 [意图识别] 调用 LLM 分析...")
         
         user_input = state["user_input"]
         conversation_history = state.get("conversation_history", [])
@@ -194,6 +320,11 @@ class CompleteLifeOSWorkflow:
         conv_summary = self._build_conversation_summary(conversation_history)
         
         if self.llm:
+            # 历史数据的提取不依赖意图结果，趁 LLM 网络等待期间并行完成
+            historical_future = self._prep_pool.submit(
+                self._build_historical_data, conversation_history
+            )
+            update = None
             try:
                 # ✅ 正确使用 complete_intent_recognition_prompt
                 prompt = complete_intent_recognition_prompt.format_messages(
@@ -201,7 +332,7 @@ class CompleteLifeOSWorkflow:
                     conversation_summary=conv_summary
                 )
                 
-                response = self.llm.invoke(prompt)
+                response = self._invoke_llm(prompt)
                 result = self._parse_json_response(response.content)
                 
                 intent = result.get("intent", "casual_chat")
@@ -209,22 +340,29 @@ class CompleteLifeOSWorkflow:
                 reasoning = result.get("reasoning", "LLM 分析")
                 context_continuation = result.get("context_continuation", False)
                 
-                print(f"   ✓ 意图: {intent} (置信度: {confidence:.2f})")
-                print(f"   💡 推理: {reasoning[:60]}...")
+                logger.debug("✓ 意图: %s (置信度: %.2f)", intent, confidence)
+                logger.debug("💡 推理: %s...", reasoning[:60])
                 if context_continuation:
-                    print(f"   🔗 检测到上下文延续")
+                    logger.debug("🔗 检测到上下文延续")
                 
-                return {
+                update = {
                     "intent": intent,
                     "confidence": confidence,
                     "context_continuation": context_continuation,
+                    "conversation_summary": conv_summary,
                     "processing_steps": [f"🤖 意图识别: {intent} - {reasoning}"]
                 }
             
             except Exception as e:
-                print(f"   ⚠️ LLM 调用失败: {e}")
-                import traceback
+                logger.warning("⚠️ LLM 调用失败: %s", e)
                 traceback.print_exc()
+            
+            if update is not None:
+                # 历史数据只供反思节点使用，准备失败不影响意图结果（反思节点会重新计算）
+                historical_data = self._resolve_historical_data(historical_future)
+                if historical_data is not None:
+                    update["historical_data"] = historical_data
+                return update
         
         # 降级：简单规则匹配
         intent = self._fallback_intent_detection(user_input)
@@ -232,39 +370,43 @@ class CompleteLifeOSWorkflow:
             "intent": intent,
             "confidence": 0.6,
             "context_continuation": False,
+            "conversation_summary": conv_summary,
             "processing_steps": [f"规则匹配: {intent}"]
         }
     
+    @staticmethod
+    def _resolve_historical_data(future: Future) -> Optional[str]:
+        """取后台准备的历史数据，失败时返回 None"""
+        try:
+            return future.result()
+        except Exception as e:
+            logger.warning("⚠️ 历史数据准备失败: %s", e)
+            return None
+    
     def _fallback_intent_detection(self, text: str) -> str:
         """降级的意图检测"""
-        text_lower = text.lower()
-        
-        if any(k in text_lower for k in ['习惯', '坚持', '打卡']):
-            return "habit_tracking"
-        elif any(k in text_lower for k in ['目标', '想要', '计划', '实现', '学习']):
-            return "goal_setting"
-        elif any(k in text_lower for k in ['总结', '反思', '回顾', '复盘']):
-            return "reflection"
-        elif any(k in text_lower for k in ['累', '焦虑', '压力', '崩溃', '疲惫']):
-            return "emotion_support"
-        elif any(k in text_lower for k in ['任务', '要做', '整理', '待办', '安排']):
-            return "task_management"
-        else:
-            return "casual_chat"
+        # 中文没有空格分词，只能按子串匹配：一次正则扫描找出所有命中的意图，再按优先级取第一个
+        matched = _match_keyword_categories(
+            _FALLBACK_INTENT_RE, _FALLBACK_WORD_INTENT, text.lower()
+        )
+        return next(
+            (intent for intent, _ in _FALLBACK_INTENT_RULES if intent in matched),
+            "casual_chat"
+        )
     
     def _task_processing_node(self, state: AgentState) -> Dict:
         """任务处理节点 - 使用 enhanced_task_extraction_prompt"""
-        print("📋 [任务处理] 提取并分析任务...")
+        logger.debug("📋 [任务处理] 提取并分析任务...")
         
         user_input = state["user_input"]
-        conv_summary = self._build_conversation_summary(
+        conv_summary = state.get("conversation_summary") or self._build_conversation_summary(
             state.get("conversation_history", [])
         )
         
         # 处理上下文延续（如"第二步呢"）
         context_continuation = state.get("context_continuation", False)
         if context_continuation and len(user_input) < 20:
-            print("   🔍 检测到延续性提问，从对话历史中提取任务上下文...")
+            logger.debug("🔍 检测到延续性提问，从对话历史中提取任务上下文...")
             user_input_with_context = f"{conv_summary}\n\n当前问题：{user_input}"
         else:
             user_input_with_context = user_input
@@ -277,7 +419,7 @@ class CompleteLifeOSWorkflow:
                     user_input=user_input_with_context
                 )
                 
-                response = self.llm.invoke(prompt)
+                response = self._invoke_llm(prompt)
                 result = self._parse_json_response(response.content)
                 
                 tasks = result.get("tasks", [])
@@ -286,11 +428,10 @@ class CompleteLifeOSWorkflow:
                 total_count = result.get("total_count", len(tasks))
                 
                 # 按优先级排序任务
-                priority_order = {'high': 1, 'medium': 2, 'low': 3, '': 4}
-                tasks.sort(key=lambda t: priority_order.get(t.get('priority', '').lower(), 4))
+                tasks.sort(key=lambda t: _PRIORITY_ORDER.get(t.get('priority', '').lower(), 4))
                 
-                print(f"   ✓ 提取到 {len(tasks)} 个任务")
-                print(f"   📊 优先级分析: {priority_analysis}")
+                logger.debug("✓ 提取到 %s 个任务", len(tasks))
+                logger.debug("📊 优先级分析: %s", priority_analysis)
                 
                 if len(tasks) == 0:
                     # 根据建议生成智能回应
@@ -314,8 +455,8 @@ class CompleteLifeOSWorkflow:
                     deadline = t.get('deadline', '')
                     estimated_time = t.get('estimated_time', '')
                     
-                    priority_icon = {'high': '🔴', 'medium': '🟡', 'low': '🟢'}.get(priority, '⚪')
-                    priority_text = {'high': '高优先级', 'medium': '中优先级', 'low': '低优先级'}.get(priority, '')
+                    priority_icon = _PRIORITY_ICONS.get(priority, '⚪')
+                    priority_text = _PRIORITY_LABELS.get(priority, '')
                     
                     task_line = f"{i}. {priority_icon} {title}"
                     if priority_text:
@@ -344,7 +485,7 @@ class CompleteLifeOSWorkflow:
                 
                 final_output = "\n".join(output_parts)
                 
-                print(f"   ✓ 任务分析完成")
+                logger.debug("✓ 任务分析完成")
                 
                 return {
                     "analyzed_tasks": tasks,
@@ -358,8 +499,7 @@ class CompleteLifeOSWorkflow:
                 }
                 
             except Exception as e:
-                print(f"   ⚠️ 任务处理失败: {e}")
-                import traceback
+                logger.warning("⚠️ 任务处理失败: %s", e)
                 traceback.print_exc()
         
         # 降级处理
@@ -373,10 +513,10 @@ class CompleteLifeOSWorkflow:
     
     def _personalization_node(self, state: AgentState) -> Dict:
         """个性化增强节点 - 使用 personalization_prompt"""
-        print("🎨 [个性化] 根据用户画像优化建议...")
+        logger.debug("🎨 [个性化] 根据用户画像优化建议...")
         
         if not self.llm:
-            print("   ⚠️ 无 LLM，跳过个性化")
+            logger.debug("⚠️ 无 LLM，跳过个性化")
             return {}
         
         try:
@@ -392,7 +532,7 @@ class CompleteLifeOSWorkflow:
             ])
             
             # 构建对话历史文本
-            conv_history_text = self._build_conversation_summary(conversation_history)
+            conv_history_text = state.get("conversation_summary") or self._build_conversation_summary(conversation_history)
             
             # ✅ 正确使用 personalization_prompt
             prompt = personalization_prompt.format_messages(
@@ -401,44 +541,42 @@ class CompleteLifeOSWorkflow:
                 conversation_history=conv_history_text
             )
             
-            response = self.llm.invoke(prompt)
+            response = self._invoke_llm(prompt)
             result = self._parse_json_response(response.content)
             
             personalized_suggestions = result.get("personalized_suggestions", [])
             adapted_timeline = result.get("adapted_timeline", "")
             motivation_style = result.get("motivation_style", "目标驱动型")
             
-            print(f"   ✓ 个性化完成 (激励方式: {motivation_style})")
+            logger.debug("✓ 个性化完成 (激励方式: %s)", motivation_style)
             
             # 增强原有输出
-            enhanced_output = state.get("final_output", "")
+            parts = [state.get("final_output", "")]
             if personalized_suggestions:
-                enhanced_output += "\n\n🎯 根据你的习惯定制建议："
-                for s in personalized_suggestions[:3]:
-                    enhanced_output += f"\n• {s}"
+                parts.append("\n\n🎯 根据你的习惯定制建议：")
+                parts.extend(f"\n• {s}" for s in personalized_suggestions[:3])
             
             if adapted_timeline:
-                enhanced_output += f"\n\n⏰ 推荐时间安排：\n{adapted_timeline}"
+                parts.append(f"\n\n⏰ 推荐时间安排：\n{adapted_timeline}")
             
             return {
-                "final_output": enhanced_output,
+                "final_output": "".join(parts),
                 "processing_steps": state.get("processing_steps", []) + [
                     f"🎨 个性化增强 ({motivation_style})"
                 ]
             }
             
         except Exception as e:
-            print(f"   ⚠️ 个性化失败: {e}")
-            import traceback
+            logger.warning("⚠️ 个性化失败: %s", e)
             traceback.print_exc()
             return {}
     
     def _emotion_support_node(self, state: AgentState) -> Dict:
         """情绪支持节点 - 使用 emotion_support_prompt"""
-        print("💚 [情绪支持] 生成温暖回应...")
+        logger.debug("💚 [情绪支持] 生成温暖回应...")
         
         user_input = state["user_input"]
-        conv_summary = self._build_conversation_summary(
+        conv_summary = state.get("conversation_summary") or self._build_conversation_summary(
             state.get("conversation_history", [])
         )
         
@@ -450,7 +588,7 @@ class CompleteLifeOSWorkflow:
                     conversation_summary=conv_summary
                 )
                 
-                response = self.llm.invoke(prompt)
+                response = self._invoke_llm(prompt)
                 result = self._parse_json_response(response.content)
                 
                 empathy_response = result.get("empathy_response", "我理解你的感受")
@@ -458,7 +596,7 @@ class CompleteLifeOSWorkflow:
                 quick_actions = result.get("quick_actions", [])
                 tone = result.get("tone", "温暖")
                 
-                print(f"   ✓ 回应语气: {tone}")
+                logger.debug("✓ 回应语气: %s", tone)
                 
                 # 构建输出
                 output_parts = [empathy_response]
@@ -481,8 +619,7 @@ class CompleteLifeOSWorkflow:
                 }
                 
             except Exception as e:
-                print(f"   ⚠️ 情绪支持失败: {e}")
-                import traceback
+                logger.warning("⚠️ 情绪支持失败: %s", e)
                 traceback.print_exc()
         
         # 降级回应
@@ -493,7 +630,7 @@ class CompleteLifeOSWorkflow:
     
     def _habit_management_node(self, state: AgentState) -> Dict:
         """习惯管理节点 - 使用 habit_management_prompt"""
-        print("🎯 [习惯管理] 处理习惯相关请求...")
+        logger.debug("🎯 [习惯管理] 处理习惯相关请求...")
         
         user_input = state["user_input"]
         
@@ -504,13 +641,13 @@ class CompleteLifeOSWorkflow:
                     user_input=user_input
                 )
                 
-                response = self.llm.invoke(prompt)
+                response = self._invoke_llm(prompt)
                 result = self._parse_json_response(response.content)
                 
                 habit_plan = result.get("habit_plan", {})
                 motivation = result.get("motivation_message", "")
                 
-                print(f"   ✓ 习惯计划: {habit_plan.get('habit_name', '新习惯')}")
+                logger.debug("✓ 习惯计划: %s", habit_plan.get('habit_name', '新习惯'))
                 
                 # 构建输出
                 output_parts = ["好的，帮你设计习惯计划：\n"]
@@ -532,8 +669,7 @@ class CompleteLifeOSWorkflow:
                 }
                 
             except Exception as e:
-                print(f"   ⚠️ 习惯管理失败: {e}")
-                import traceback
+                logger.warning("⚠️ 习惯管理失败: %s", e)
                 traceback.print_exc()
         
         # 降级
@@ -544,11 +680,11 @@ class CompleteLifeOSWorkflow:
     
     def _goal_planning_node(self, state: AgentState) -> Dict:
         """目标规划节点 - 使用 goal_planning_prompt"""
-        print("🎯 [目标规划] 拆解目标...")
+        logger.debug("🎯 [目标规划] 拆解目标...")
         
         user_input = state["user_input"]
         conversation_history = state.get("conversation_history", [])
-        conv_summary = self._build_conversation_summary(conversation_history)
+        conv_summary = state.get("conversation_summary") or self._build_conversation_summary(conversation_history)
         
         if self.llm:
             try:
@@ -558,7 +694,7 @@ class CompleteLifeOSWorkflow:
                     conversation_summary=conv_summary
                 )
                 
-                response = self.llm.invoke(prompt)
+                response = self._invoke_llm(prompt)
                 result = self._parse_json_response(response.content)
                 
                 # 检查是否为延续性回答
@@ -572,7 +708,7 @@ class CompleteLifeOSWorkflow:
                     time_req = result.get("time_required", "")
                     result_exp = result.get("expected_result", "")
                     
-                    print(f"   ✓ 延续目标: 第{step_num}步")
+                    logger.debug("✓ 延续目标: 第%s步", step_num)
                     
                     output_parts = [f"🚀 **第{step_num}步**:\n"]
                     output_parts.append(f"📝 **行动**: {action}\n")
@@ -597,8 +733,8 @@ class CompleteLifeOSWorkflow:
                 resources = result.get("resources", [])
                 tips = result.get("tips", [])
                 
-                print(f"   ✓ 目标: {goal}")
-                print(f"   ✓ 里程碑: {len(milestones)}个")
+                logger.debug("✓ 目标: %s", goal)
+                logger.debug("✓ 里程碑: %s个", len(milestones))
                 
                 # 构建输出
                 output_parts = [f"🎯 **目标**: {goal}"]
@@ -657,8 +793,7 @@ class CompleteLifeOSWorkflow:
                 }
                 
             except Exception as e:
-                print(f"   ⚠️ 目标规划失败: {e}")
-                import traceback
+                logger.warning("⚠️ 目标规划失败: %s", e)
                 traceback.print_exc()
         
         # 降级
@@ -669,31 +804,15 @@ class CompleteLifeOSWorkflow:
     
     def _reflection_guide_node(self, state: AgentState) -> Dict:
         """反思引导节点 - 使用 reflection_prompt"""
-        print("📝 [反思引导] 生成反思框架...")
+        logger.debug("📝 [反思引导] 生成反思框架...")
         
         user_input = state["user_input"]
         conversation_history = state.get("conversation_history", [])
         
-        # 从历史中提取数据（如果有）
-        historical_data = ""
-        if conversation_history:
-            # 提取最近的任务、目标等信息
-            recent_tasks = []
-            recent_goals = []
-            for turn in conversation_history[-5:]:
-                if turn.get('intent') == 'task_management':
-                    extracted = turn.get('extracted_data', {})
-                    tasks = extracted.get('tasks', [])
-                    recent_tasks.extend([t.get('title', '') for t in tasks[:3]])
-                elif turn.get('intent') == 'goal_setting':
-                    recent_goals.append(turn.get('user_message', '')[:50])
-            
-            if recent_tasks or recent_goals:
-                historical_data = "最近活动:\n"
-                if recent_tasks:
-                    historical_data += f"任务: {', '.join(recent_tasks[:5])}\n"
-                if recent_goals:
-                    historical_data += f"目标: {', '.join(recent_goals[:3])}"
+        # 从历史中提取数据（如果有），意图识别阶段通常已并行准备好
+        historical_data = state.get("historical_data")
+        if historical_data is None:
+            historical_data = self._build_historical_data(conversation_history)
         
         if self.llm:
             try:
@@ -703,7 +822,7 @@ class CompleteLifeOSWorkflow:
                     historical_data=historical_data if historical_data else "暂无历史数据"
                 )
                 
-                response = self.llm.invoke(prompt)
+                response = self._invoke_llm(prompt)
                 result = self._parse_json_response(response.content)
                 
                 summary = result.get("summary", "")
@@ -712,7 +831,7 @@ class CompleteLifeOSWorkflow:
                 improvements = result.get("improvements", [])
                 next_actions = result.get("next_actions", [])
                 
-                print(f"   ✓ 反思总结生成完成")
+                logger.debug("✓ 反思总结生成完成")
                 
                 # 构建输出
                 output_parts = []
@@ -751,8 +870,7 @@ class CompleteLifeOSWorkflow:
                 }
                 
             except Exception as e:
-                print(f"   ⚠️ 反思引导失败: {e}")
-                import traceback
+                logger.warning("⚠️ 反思引导失败: %s", e)
                 traceback.print_exc()
         
         # 降级
@@ -763,47 +881,54 @@ class CompleteLifeOSWorkflow:
     
     def _casual_response_node(self, state: AgentState) -> Dict:
         """闲聊回应节点"""
-        print("💬 [闲聊] 生成友好回应...")
+        logger.debug("💬 [闲聊] 生成友好回应...")
         
         user_input = state["user_input"]
         conversation_history = state.get("conversation_history", [])
         
         if self.llm:
+            # 相同输入 + 相同上下文的闲聊直接复用之前的回复
+            cache_key = make_casual_key(user_input, conversation_history)
+            cached = get_cached_casual(cache_key)
+            if cached is not None:
+                logger.debug("✓ 命中回复缓存")
+                return {
+                    "final_output": cached,
+                    "processing_steps": ["💬 AI 生成友好回应（缓存）"]
+                }
+            
+            # 语义相近的开场闲聊（无历史上下文）复用已有回复
+            use_semantic = self.semantic_cache is not None and not conversation_history
+            query_embedding = None
+            if use_semantic:
+                cached, query_embedding = self.semantic_cache.lookup(user_input)
+                if cached is not None:
+                    logger.debug("✓ 命中语义缓存")
+                    return {
+                        "final_output": cached,
+                        "processing_steps": ["💬 AI 生成友好回应（语义缓存）"]
+                    }
+            
             try:
                 # 构建对话历史上下文
-                history_text = ""
-                if conversation_history:
-                    recent_history = conversation_history[-3:]
-                    history_text = "\n".join([
-                        f"用户: {h.get('user_message', '')}\n助理: {h.get('assistant_message', '')[:100]}"
-                        for h in recent_history
-                    ])
+                history_text = "\n".join(
+                    f"用户: {h.get('user_message') or ''}\n助理: {(h.get('assistant_message') or '')[:100]}"
+                    for h in conversation_history[-3:]
+                )
                 
                 # 调用大模型生成个性化回应
-                from langchain_core.prompts import ChatPromptTemplate
-                casual_prompt = ChatPromptTemplate.from_messages([
-                    ("system", """你是 LifeOS 智能助理，一个温暖、专业、富有同理心的生活助手。
-
-你的特点：
-- 友善亲切，像朋友一样交流
-- 善于倾听，理解用户情绪
-- 适当使用 emoji 让对话更生动（但不过度）
-- 回复简洁明了，不啰嗦
-- 能够记住对话上下文，提供连贯回复
-
-根据用户的输入，生成温暖、自然、贴合上下文的回应。"""),
-                    ("human", f"""对话历史：
-{history_text if history_text else '（这是第一轮对话）'}
-
-用户当前输入：{user_input}
-
-请生成一个友好、自然的回应。""")
-                ])
+                prompt = casual_chat_prompt.format_messages(
+                    history_text=history_text if history_text else '（这是第一轮对话）',
+                    user_input=user_input
+                )
                 
-                response = self.llm.invoke(casual_prompt.format_messages())
+                response = self._invoke_llm(prompt)
                 output = response.content.strip()
+                put_cached_casual(cache_key, output)
+                if use_semantic:
+                    self.semantic_cache.add(user_input, output, embedding=query_embedding)
                 
-                print(f"   ✓ 生成个性化回应")
+                logger.debug("✓ 生成个性化回应")
                 
                 return {
                     "final_output": output,
@@ -811,23 +936,17 @@ class CompleteLifeOSWorkflow:
                 }
                 
             except Exception as e:
-                print(f"   ⚠️ 闲聊回应失败: {e}")
-                import traceback
+                logger.warning("⚠️ 闲聊回应失败: %s", e)
                 traceback.print_exc()
         
-        # 降级回复（基于规则）
-        user_input_lower = user_input.lower()
-        
-        if any(word in user_input_lower for word in ['你好', 'hi', 'hello', '嗨']):
-            output = "你好！我是 LifeOS 智能助理 😊\n\n我可以帮你：\n• 📋 管理任务和待办\n• 🎯 追踪习惯打卡\n• 🌟 设定和拆解目标\n• 📝 记录反思总结\n• 💚 提供情绪支持\n\n有什么可以帮到你的吗？"
-        elif any(word in user_input_lower for word in ['功能', '能做', '可以做', '帮我']):
-            output = "我有这些能力：\n\n1. 📋 **任务管理**：整理待办，智能排序\n2. 🎯 **习惯追踪**：打卡记录，数据统计\n3. 🌟 **目标规划**：拆解目标，制定计划\n4. 📝 **反思总结**：定期回顾，持续改进\n5. 💚 **情绪支持**：倾听理解，温暖陪伴\n\n试试告诉我你现在想做什么吧！"
-        elif any(word in user_input_lower for word in ['谢谢', '感谢', 'thanks', 'thx']):
-            output = "不客气！😊 很高兴能帮到你。\n\n有其他需要随时告诉我哦！"
-        elif any(word in user_input_lower for word in ['再见', 'bye', '拜拜']):
-            output = "再见！👋 记得随时回来找我，我会一直在这里支持你！"
-        else:
-            output = "我在呢！😊 有什么可以帮你的吗？\n\n你可以告诉我你的任务、目标，或者只是聊聊天也可以~"
+        # 降级回复（基于规则）：一次扫描找出命中的类别，再按优先级取回复
+        matched = _match_keyword_categories(
+            _CASUAL_KEYWORD_RE, _CASUAL_WORD_CATEGORY, user_input.lower()
+        )
+        output = next(
+            (_CASUAL_RESPONSES[category] for category, _ in _CASUAL_KEYWORD_RULES if category in matched),
+            _CASUAL_DEFAULT_RESPONSE
+        )
         
         return {
             "final_output": output,
@@ -836,12 +955,12 @@ class CompleteLifeOSWorkflow:
     
     def _output_generation_node(self, state: AgentState) -> Dict:
         """输出生成节点 - 最终整合"""
-        print("✨ [输出生成] 整合最终回复...")
+        logger.debug("✨ [输出生成] 整合最终回复...")
         
         # 如果已有 final_output，保持不变
         if state.get("final_output"):
             final_output = state["final_output"]
-            print(f"   ✓ 使用已生成的输出 ({len(final_output)} 字符)")
+            logger.debug("✓ 使用已生成的输出 (%s 字符)", len(final_output))
             return {"final_output": final_output}
         
         # 否则根据意图生成默认输出
@@ -850,60 +969,101 @@ class CompleteLifeOSWorkflow:
         if intent == "task_management":
             tasks = state.get("analyzed_tasks", [])
             if tasks:
-                output = f"好的！我帮你整理了 {len(tasks)} 个任务：\n\n"
-                for i, task in enumerate(tasks[:5], 1):
-                    output += f"{i}. {task.get('title', '任务')}\n"
-                output += "\n💡 建议从最重要的开始！"
+                parts = [f"好的！我帮你整理了 {len(tasks)} 个任务：\n\n"]
+                parts.extend(
+                    f"{i}. {task.get('title', '任务')}\n"
+                    for i, task in enumerate(tasks[:5], 1)
+                )
+                parts.append("\n💡 建议从最重要的开始！")
+                output = "".join(parts)
             else:
                 output = "我理解了，让我们开始整理任务吧！"
         else:
             output = "好的，我明白了！让我来帮你处理。"
         
-        print(f"   ✓ 生成默认输出")
+        logger.debug("✓ 生成默认输出")
         return {"final_output": output}
     
-    def _route_by_intent(self, state: AgentState) -> str:
-        """根据意图路由"""
-        intent = state.get("intent", "casual_chat")
-        print(f"🔀 路由到: {intent}")
-        return intent
-    
     # =========================================================================
     # 执行方法
     # =========================================================================
     
-    def run(
+    def _save_turn(
         self,
+        session_id: str,
+        user_id: str,
         user_input: str,
-        user_id: str = "default_user",
-        session_id: Optional[str] = None
-    ) -> Dict[str, Any]:
-        """
-        执行完整工作流
-        
-        Args:
-            user_input: 用户输入
-            user_id: 用户ID
-            session_id: 会话ID（用于多轮对话）
-        
-        Returns:
-            执行结果
-        """
-        print(f"\n{'='*60}")
-        print(f"🚀 开始处理用户输入: {user_input[:50]}...")
-        print(f"{'='*60}\n")
+        result: Dict[str, Any]
+    ) -> Future:
+        """提交一轮对话到后台写线程，返回写入完成的 Future"""
+        future = self.conversation_manager.add_turn_async(
+            session_id=session_id,
+            user_id=user_id,
+            user_message=user_input,
+            assistant_message=result.get("final_output", ""),
+            intent=result.get("intent", "unknown"),
+            intent_confidence=result.get("confidence", 0.0),
+            extracted_data={
+                "tasks": result.get("analyzed_tasks", []),
+                "steps": result.get("processing_steps", []),
+                "priority_analysis": result.get("priority_analysis", {})
+            }
+        )
+        future.add_done_callback(self._log_saved_turn)
+        return future
+    
+    @staticmethod
+    def _log_saved_turn(future: Future):
+        error = future.exception()
+        if error is not None:
+            logger.warning("⚠️ 保存对话失败: %s", error)
+        else:
+            logger.debug("💾 对话已保存")
+    
+    def _clear_pending_write(self, session_id: str, future: Future):
+        with self._pending_lock:
+            if self._pending_writes.get(session_id) is future:
+                del self._pending_writes[session_id]
+    
+    def _wait_pending_write(self, session_id: str):
+        with self._pending_lock:
+            future = self._pending_writes.get(session_id)
+        if future is not None:
+            wait([future])
+    
+    def flush_pending_writes(self):
+        """等待所有后台对话写入完成"""
+        if self.conversation_manager:
+            self.conversation_manager.flush()
+    
+    def close(self):
+        """关闭工作流：停止预取线程池，提交排队中的对话并关闭数据库连接"""
+        self._prep_pool.shutdown(wait=True)
+        if self.conversation_manager:
+            self.conversation_manager.close()
+    
+    def _prepare_run(
+        self,
+        user_input: str,
+        user_id: str,
+        session_id: Optional[str]
+    ) -> tuple:
+        """加载对话历史（或创建新会话）并构建初始状态，返回 (initial_state, session_id)"""
+        logger.info("🚀 开始处理用户输入: %s...", user_input[:50])
         
         # 获取对话历史
         conversation_history = []
         if self.conversation_manager and session_id:
+            # 上一轮的后台写入完成后再读取，保证历史完整
+            self._wait_pending_write(session_id)
             conversation_history = self.conversation_manager.get_conversation_history(
                 session_id, last_n_turns=5
             )
-            print(f"📚 加载对话历史: {len(conversation_history)} 轮")
+            logger.debug("📚 加载对话历史: %s 轮", len(conversation_history))
         elif self.conversation_manager:
             # 创建新会话
             session_id = self.conversation_manager.create_session(user_id)
-            print(f"✨ 创建新会话: {session_id}")
+            logger.debug("✨ 创建新会话: %s", session_id)
         
         # 初始化状态
         initial_state = {
@@ -918,46 +1078,123 @@ class CompleteLifeOSWorkflow:
             "priority_analysis": {},
             "processing_steps": [],
             "final_output": "",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso_cached()
+        }
+        return initial_state, session_id
+    
+    def _error_result(self, initial_state: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        """工作流执行失败时的降级结果"""
+        logger.error("❌ 工作流执行失败: %s", error)
+        traceback.print_exc()
+        return {
+            **initial_state,
+            "final_output": "抱歉，处理过程中出现了问题。请稍后再试。",
+            "processing_steps": [f"错误: {str(error)}"]
         }
+    
+    def _finalize_run(
+        self,
+        result: Dict[str, Any],
+        user_input: str,
+        user_id: str,
+        session_id: Optional[str]
+    ) -> Dict[str, Any]:
+        """提交对话保存并返回结果"""
+        # 保存对话（后台写入，同一会话的下一轮开始前会等待其完成）
+        if self.conversation_manager and session_id:
+            future = self._save_turn(session_id, user_id, user_input, result)
+            with self._pending_lock:
+                self._pending_writes[session_id] = future
+            future.add_done_callback(
+                lambda f, sid=session_id: self._clear_pending_write(sid, f)
+            )
+        
+        return result
+    
+    def run(
+        self,
+        user_input: str,
+        user_id: str = "default_user",
+        session_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        执行完整工作流
+        
+        Args:
+            user_input: 用户输入
+            user_id: 用户ID
+            session_id: 会话ID（用于多轮对话）
+        
+        Returns:
+            执行结果
+        """
+        initial_state, session_id = self._prepare_run(user_input, user_id, session_id)
         
         # 执行工作流
         try:
             result = self.workflow_app.invoke(initial_state)
-            print(f"\n✅ 工作流执行成功")
-            print(f"📊 处理步骤: {result.get('processing_steps', [])}")
+            logger.info("✅ 工作流执行成功")
+            logger.debug("📊 处理步骤: %s", result.get('processing_steps', []))
         except Exception as e:
-            print(f"\n❌ 工作流执行失败: {e}")
-            import traceback
-            traceback.print_exc()
-            result = {
-                **initial_state,
-                "final_output": "抱歉，处理过程中出现了问题。请稍后再试。",
-                "processing_steps": [f"错误: {str(e)}"]
-            }
+            result = self._error_result(initial_state, e)
         
-        # 保存对话
-        if self.conversation_manager and session_id:
-            try:
-                self.conversation_manager.add_turn(
-                    session_id=session_id,
-                    user_id=user_id,
-                    user_message=user_input,
-                    assistant_message=result.get("final_output", ""),
-                    intent=result.get("intent", "unknown"),
-                    intent_confidence=result.get("confidence", 0.0),
-                    extracted_data={
-                        "tasks": result.get("analyzed_tasks", []),
-                        "steps": result.get("processing_steps", []),
-                        "priority_analysis": result.get("priority_analysis", {})
-                    }
-                )
-                print(f"💾 对话已保存")
-            except Exception as e:
-                print(f"⚠️ 保存对话失败: {e}")
+        return self._finalize_run(result, user_input, user_id, session_id)
+    
+    async def arun(
+        self,
+        user_input: str,
+        user_id: str = "default_user",
+        session_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        异步执行完整工作流（供 FastAPI 等异步调用方使用）
         
-        print(f"\n{'='*60}\n")
-        return result
+        数据库读取放到线程中执行，图通过 ainvoke 执行，均不阻塞事件循环
+        """
+        initial_state, session_id = await asyncio.to_thread(
+            self._prepare_run, user_input, user_id, session_id
+        )
+        
+        try:
+            result = await self.workflow_app.ainvoke(initial_state)
+            logger.info("✅ 工作流执行成功")
+            logger.debug("📊 处理步骤: %s", result.get('processing_steps', []))
+        except Exception as e:
+            result = self._error_result(initial_state, e)
+        
+        return self._finalize_run(result, user_input, user_id, session_id)
+    
+    def stream(
+        self,
+        user_input: str,
+        user_id: str = "default_user",
+        session_id: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        流式执行工作流，每完成一个处理步骤就产出一个事件
+        
+        产出事件：
+            {"type": "session", "session_id": ...}     会话确定后立即产出
+            {"type": "step", "step": ...}              每个新的处理步骤
+            {"type": "final", "result": {...}}         最终结果（与 run() 返回值相同）
+        """
+        initial_state, session_id = self._prepare_run(user_input, user_id, session_id)
+        yield {"type": "session", "session_id": initial_state["session_id"]}
+        
+        result = initial_state
+        emitted_steps = 0
+        try:
+            for state in self.workflow_app.stream(initial_state, stream_mode="values"):
+                result = state
+                steps = state.get("processing_steps", [])
+                for step in steps[emitted_steps:]:
+                    yield {"type": "step", "step": step}
+                emitted_steps = len(steps)
+            logger.info("✅ 工作流执行成功")
+        except Exception as e:
+            result = self._error_result(initial_state, e)
+        
+        yield {"type": "final", "result": self._finalize_run(result, user_input, user_id, session_id)}
 
 
 def create_complete_workflow(
@@ -990,7 +1227,6 @@ def create_complete_workflow(
             llm_provider = "mock"
         else:
             try:
-                from agents.hunyuan_llm import create_hunyuan_llm
                 # 从环境变量直接读取
                 llm = create_hunyuan_llm(
                     secret_id=os.getenv("TENCENT_SECRET_ID"),
@@ -3,16 +3,12 @@ LifeOS 完整智能体 Demo
 震撼展示：真实 LLM + 多轮对话 + 完整功能
 """
 
+import logging
 import os
 import sys
-from datetime import datetime
 from dotenv import load_dotenv
 
-# 加载环境变量
-load_dotenv()
-
-from agents.workflow_complete import create_complete_workflow
-from agents.conversation_manager import ConversationManager
+# 工作流（LangChain/LangGraph）导入较慢，推迟到各个 Demo 函数内部，菜单可以立即显示
 
 
 def print_section(title: str, emoji: str = "🎬"):
@@ -23,30 +19,38 @@ def print_section(title: str, emoji: str = "🎬"):
 
 
 def print_result(result: dict):
-    """美化打印结果"""
-    print("\n" + "─" * 80)
-    print("🤖 LifeOS 助理回复")
-    print("─" * 80)
-    print(result.get("final_output", "无输出"))
-    print("─" * 80)
+    """美化打印结果（先拼好全部内容，再一次性输出）"""
+    separator = "─" * 80
+    lines = [
+        "\n" + separator,
+        "🤖 LifeOS 助理回复",
+        separator,
+        result.get("final_output", "无输出"),
+        separator,
+    ]
     
     # 显示处理步骤
     steps = result.get("processing_steps", [])
     if steps:
-        print("\n📋 处理步骤：")
-        for step in steps:
-            print(f"   • {step}")
+        lines.append("\n📋 处理步骤：")
+        lines.extend(f"   • {step}" for step in steps)
     
     # 显示元数据
-    print(f"\n📊 元数据:")
-    print(f"   • 意图: {result.get('intent', 'unknown')}")
-    print(f"   • 置信度: {result.get('confidence', 0):.2f}")
-    print(f"   • 会话ID: {result.get('session_id', 'N/A')}")
-    print()
+    lines.extend([
+        "\n📊 元数据:",
+        f"   • 意图: {result.get('intent', 'unknown')}",
+        f"   • 置信度: {result.get('confidence', 0):.2f}",
+        f"   • 会话ID: {result.get('session_id', 'N/A')}",
+        "",
+    ])
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def demo_1_multi_turn_conversation():
     """Demo 1: 多轮对话展示"""
+    from agents.workflow_complete import create_complete_workflow
+    from agents.conversation_manager import ConversationManager
+    
     print_section("Demo 1: 多轮对话 - 展示上下文记忆", "🎭")
     
     print("""
@@ -97,7 +101,8 @@ def demo_1_multi_turn_conversation():
     result_3 = workflow.run(user_msg_3, user_id="demo_user_001", session_id=session_id)
     print_result(result_3)
     
-    # 显示会话统计
+    # 显示会话统计（等待后台写入完成）
+    workflow.flush_pending_writes()
     stats = conv_manager.get_session_stats(session_id)
     print(f"\n📊 会话统计:")
     print(f"   • 总轮次: {stats.get('total_turns', 0)}")
@@ -106,6 +111,8 @@ def demo_1_multi_turn_conversation():
 
 def demo_2_all_intents():
     """Demo 2: 六种意图全覆盖"""
+    from agents.workflow_complete import create_complete_workflow
+    
     print_section("Demo 2: 六大核心功能展示", "🎯")
     
     print("""
@@ -146,6 +153,8 @@ def demo_2_all_intents():
 
 def demo_3_habit_tracking_workflow():
     """Demo 3: 习惯追踪完整流程"""
+    from agents.workflow_complete import create_complete_workflow
+    
     print_section("Demo 3: 习惯追踪完整流程", "🎯")
     
     print("""
@@ -208,6 +217,8 @@ def demo_3_habit_tracking_workflow():
 
 def demo_4_goal_breakdown():
     """Demo 4: 目标拆解展示"""
+    from agents.workflow_complete import create_complete_workflow
+    
     print_section("Demo 4: 目标智能拆解", "🌟")
     
     print("""
@@ -354,6 +365,12 @@ def main():
 
 
 if __name__ == "__main__":
+    # 加载环境变量
+    load_dotenv()
+    
+    # 工作流节点跟踪走日志，LOG_LEVEL=DEBUG 可查看每个节点的处理过程
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(message)s")
+    
     try:
         main()
     except KeyboardInterrupt:
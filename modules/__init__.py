@@ -59,9 +59,12 @@ from .llm_service import (
     OpenAIProvider,
     MockProvider,
     call_llm,
+    acall_llm,
     init_llm_service,
     get_llm_service
 )
+from .ttl_cache import TTLLRUCache
+from .llm_cache import LLMCache, CachedLLMProvider
 
 # 集成示例
 from .lifeos_integration_example import LifeOSAssistant
@@ -117,8 +120,12 @@ __all__ = [
     'OpenAIProvider',
     'MockProvider',
     'call_llm',
+    'acall_llm',
     'init_llm_service',
     'get_llm_service',
+    'TTLLRUCache',
+    'LLMCache',
+    'CachedLLMProvider',
     
     # 集成
     'LifeOSAssistant',
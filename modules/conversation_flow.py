@@ -9,7 +9,9 @@
 4. 优雅降级与回退
 """
 
+import random
 import re
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
@@ -89,6 +91,23 @@ TASK_PATTERNS = [
     r".*清单",
 ]
 
+# 句式模式在模块加载时编译一次，保留原始字符串用于生成信号描述
+_COMPILED_EMOTION_PATTERNS = [(p, re.compile(p)) for p in EMOTION_PATTERNS]
+_COMPILED_TASK_PATTERNS = [(p, re.compile(p)) for p in TASK_PATTERNS]
+
+# 闲聊常用词
+CASUAL_WORDS = ("你好", "在吗", "干嘛", "聊天")
+
+# 从分类信号中挑出情绪词时使用的集合
+_EMOTION_KEYWORD_SET = frozenset(EMOTION_KEYWORDS)
+
+# 情绪支持模式的回复模板
+_EMOTION_RESPONSE_TEMPLATES = (
+    "听起来你现在{emotion}，我理解这种感受。\n\n你想先说说怎么回事，还是让我帮你做点什么来缓解一下？",
+    "感受到你的{emotion}了。别急，我们一起面对。\n\n要不要我帮你把压力源理一理，或者先给你一些放松的小建议？",
+    "{emotion}的时候确实不容易。\n\n我可以帮你两件事：1）听你说说 2）帮你拆解任务降低压力。你想要哪个？"
+)
+
 
 # ============================================================================
 # 意图分类器
@@ -104,36 +123,35 @@ class IntentClassifier:
         
         Returns:
             IntentClassification 包含意图、置信度、信号等
+            （相同输入返回同一个缓存对象，调用方不应修改）
         """
-        text = user_input.lower().strip()
-        
+        return _cached_classify(user_input.lower().strip())
+    
+    @staticmethod
+    def _classify_text(text: str) -> IntentClassification:
+        """对已规范化（小写、去首尾空白）的文本做规则分类"""
         # 检测情绪关键词
-        emotion_signals = []
-        for keyword in EMOTION_KEYWORDS:
-            if keyword in text:
-                emotion_signals.append(keyword)
+        emotion_signals = [keyword for keyword in EMOTION_KEYWORDS if keyword in text]
         
         # 检测情绪句式
-        for pattern in EMOTION_PATTERNS:
-            if re.search(pattern, text):
-                emotion_signals.append(f"pattern:{pattern[:20]}")
+        emotion_signals.extend(
+            f"pattern:{pattern[:20]}"
+            for pattern, regex in _COMPILED_EMOTION_PATTERNS
+            if regex.search(text)
+        )
         
         # 检测任务关键词
-        task_signals = []
-        for keyword in TASK_KEYWORDS:
-            if keyword in text:
-                task_signals.append(keyword)
+        task_signals = [keyword for keyword in TASK_KEYWORDS if keyword in text]
         
         # 检测任务句式
-        for pattern in TASK_PATTERNS:
-            if re.search(pattern, text):
-                task_signals.append(f"pattern:{pattern[:20]}")
+        task_signals.extend(
+            f"pattern:{pattern[:20]}"
+            for pattern, regex in _COMPILED_TASK_PATTERNS
+            if regex.search(text)
+        )
         
         # 检测决策关键词
-        decision_signals = []
-        for keyword in DECISION_KEYWORDS:
-            if keyword in text:
-                decision_signals.append(keyword)
+        decision_signals = [keyword for keyword in DECISION_KEYWORDS if keyword in text]
         
         # 决策逻辑
         emotion_score = len(emotion_signals)
@@ -181,7 +199,7 @@ class IntentClassifier:
             )
         
         # 低置信度或闲聊
-        if len(text) < 10 or any(word in text for word in ["你好", "在吗", "干嘛", "聊天"]):
+        if len(text) < 10 or any(word in text for word in CASUAL_WORDS):
             return IntentClassification(
                 intent=IntentType.CASUAL,
                 confidence=0.6,
@@ -200,6 +218,10 @@ class IntentClassifier:
         )
 
 
+# 规则分类是纯函数，多轮对话中重复的输入直接复用结果
+_cached_classify = lru_cache(maxsize=4096)(IntentClassifier._classify_text)
+
+
 # ============================================================================
 # 对话流程管理器
 # ============================================================================
@@ -286,18 +308,13 @@ class ConversationFlowManager:
     
     def _emotion_support_response(self, classification: IntentClassification) -> str:
         """情绪支持模式响应"""
-        templates = [
-            "听起来你现在{emotion}，我理解这种感受。\n\n你想先说说怎么回事，还是让我帮你做点什么来缓解一下？",
-            "感受到你的{emotion}了。别急，我们一起面对。\n\n要不要我帮你把压力源理一理，或者先给你一些放松的小建议？",
-            "{emotion}的时候确实不容易。\n\n我可以帮你两件事：1）听你说说 2）帮你拆解任务降低压力。你想要哪个？"
-        ]
-        
         # 提取情绪词
-        emotion_words = [s for s in classification.signals if s in EMOTION_KEYWORDS]
-        emotion = emotion_words[0] if emotion_words else "不太好"
+        emotion = next(
+            (s for s in classification.signals if s in _EMOTION_KEYWORD_SET),
+            "不太好"
+        )
         
-        import random
-        template = random.choice(templates)
+        template = random.choice(_EMOTION_RESPONSE_TEMPLATES)
         
         return template.format(emotion=emotion)
     
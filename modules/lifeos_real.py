@@ -40,6 +40,10 @@ from modules.system_prompts import (
 from modules.llm_service import call_llm, init_llm_service
 
 
+# 行动助理模式下判定为"摘要"请求的关键词（否则生成任务拆解）
+_SUMMARY_KEYWORDS = frozenset({"任务", "要做", "事情", "今天", "清单"})
+
+
 class LifeOSRealAssistant:
     """LifeOS 真实助手（接入真实 LLM）"""
     
@@ -153,7 +157,7 @@ class LifeOSRealAssistant:
         print("📋 进入行动助理模式")
         
         # 判断是摘要还是拆解
-        if any(keyword in user_input for keyword in ["任务", "要做", "事情", "今天", "清单"]):
+        if any(keyword in user_input for keyword in _SUMMARY_KEYWORDS):
             print("→ 生成智能摘要\n")
             return self._generate_summary_real(user_id, user_input)
         else:
@@ -0,0 +1,119 @@
+"""
+LLM 响应缓存
+对确定性调用（低温度或调用方显式要求）按 模型+消息+参数 精确匹配缓存回复，
+命中时省去一次完整的网络往返和 token 消耗
+"""
+
+import hashlib
+import json
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+from .llm_service import LLMProvider
+from .ttl_cache import TTLLRUCache
+
+
+# 温度不高于该值的调用视为确定性调用，默认缓存
+CACHEABLE_MAX_TEMPERATURE = 0.3
+
+
+class LLMCache(TTLLRUCache):
+    """LLM 响应缓存：复用 TTLLRUCache，额外提供请求参数到缓存键的映射"""
+
+    def __init__(self, capacity: int = 1024, ttl: float = 3600):
+        super().__init__(maxsize=capacity, ttl=ttl)
+
+    @staticmethod
+    def make_key(
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """sha256(模型 + 消息 + 参数) 作为缓存键"""
+        payload = json.dumps(
+            {"m": model, "msgs": messages, "t": temperature, "n": max_tokens},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CachedLLMProvider(LLMProvider):
+    """
+    为任意 LLMProvider 加上响应缓存的装饰器
+    temperature <= CACHEABLE_MAX_TEMPERATURE 时默认缓存；cache=True/False 可强制开启/关闭
+    """
+
+    def __init__(self, provider: LLMProvider, cache: Optional[LLMCache] = None):
+        self.provider = provider
+        self.cache = cache if cache is not None else LLMCache()
+        self.model = getattr(provider, "model", type(provider).__name__)
+
+    def _cache_key(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        cache: Optional[bool]
+    ) -> Optional[str]:
+        if cache is None:
+            cache = temperature <= CACHEABLE_MAX_TEMPERATURE
+        if not cache:
+            return None
+        return LLMCache.make_key(self.model, messages, temperature, max_tokens)
+
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        cache: Optional[bool] = None
+    ) -> str:
+        """调用 LLM，可缓存的请求先查缓存"""
+        key = self._cache_key(messages, temperature, max_tokens, cache)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = self.provider.chat(messages, temperature, max_tokens)
+        if key is not None and response:
+            self.cache.put(key, response)
+        return response
+
+    async def achat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        cache: Optional[bool] = None
+    ) -> str:
+        """异步调用 LLM，可缓存的请求先查缓存"""
+        key = self._cache_key(messages, temperature, max_tokens, cache)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = await self.provider.achat(messages, temperature, max_tokens)
+        if key is not None and response:
+            self.cache.put(key, response)
+        return response
+
+    def stream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2000
+    ) -> Iterator[str]:
+        """流式调用直接交给被包装的提供者（不缓存）"""
+        return self.provider.stream(messages, temperature, max_tokens)
+
+    def astream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 2000
+    ) -> AsyncIterator[str]:
+        """异步流式调用直接交给被包装的提供者（不缓存）"""
+        return self.provider.astream(messages, temperature, max_tokens)
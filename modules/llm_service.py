@@ -3,11 +3,30 @@ LLM 服务层
 支持多种大模型接入：OpenAI、腾讯混元、本地模型等
 """
 
+import asyncio
 import os
 import json
-from typing import List, Dict, Optional, Any
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Any
 from abc import ABC, abstractmethod
-from openai import OpenAI
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from .system_prompts import PROMPT_CACHE_KEY
+
+
+# 异步客户端连接池：并发请求复用 keep-alive 连接，而不是每次新建 TLS 连接
+ASYNC_HTTP_LIMITS = httpx.Limits(max_connections=500, max_keepalive_connections=200)
+ASYNC_HTTP_TIMEOUT = 120
+
+
+def _create_async_client(api_key: str, base_url: Optional[str] = None) -> AsyncOpenAI:
+    """创建带连接池的 OpenAI 兼容异步客户端"""
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        http_client=httpx.AsyncClient(limits=ASYNC_HTTP_LIMITS, timeout=ASYNC_HTTP_TIMEOUT)
+    )
 
 
 class LLMProvider(ABC):
@@ -22,6 +41,47 @@ class LLMProvider(ABC):
     ) -> str:
         """调用 LLM 生成响应"""
         pass
+    
+    async def achat(
+        self, 
+        messages: List[Dict[str, str]], 
+        temperature: float = 0.7,
+        max_tokens: int = 2000
+    ) -> str:
+        """异步调用 LLM（默认在线程池中执行 chat，子类可替换为原生异步实现）"""
+        return await asyncio.to_thread(self.chat, messages, temperature, max_tokens)
+    
+    def stream(
+        self, 
+        messages: List[Dict[str, str]], 
+        temperature: float = 0.7,
+        max_tokens: int = 2000
+    ) -> Iterator[str]:
+        """流式生成响应，逐段产出文本（默认一次性产出完整响应）"""
+        yield self.chat(messages, temperature, max_tokens)
+    
+    async def astream(
+        self, 
+        messages: List[Dict[str, str]], 
+        temperature: float = 0.7,
+        max_tokens: int = 2000
+    ) -> AsyncIterator[str]:
+        """异步流式生成响应（默认一次性产出完整响应）"""
+        yield await self.achat(messages, temperature, max_tokens)
+
+
+def _iter_chunks(response) -> Iterator[str]:
+    """从 OpenAI 兼容的流式响应中取出非空文本增量"""
+    for chunk in response:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+async def _aiter_chunks(response) -> AsyncIterator[str]:
+    """_iter_chunks 的异步版本"""
+    async for chunk in response:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
 
 
 class HunyuanProvider(LLMProvider):
@@ -35,11 +95,11 @@ class HunyuanProvider(LLMProvider):
     ):
         self.model = model
         
-        # 腾讯混元的 OpenAI 兼容接口
-        self.client = OpenAI(
-            api_key=secret_key,
-            base_url="https://api.hunyuan.cloud.tencent.com/v1"
-        )
+        # 腾讯混元的 OpenAI 兼容接口（不接受 prompt_cache_key，
+        # 前缀缓存依赖系统提示词逐字节一致，见 system_prompts.SYSTEM_PROMPT_VERSION）
+        base_url = "https://api.hunyuan.cloud.tencent.com/v1"
+        self.client = OpenAI(api_key=secret_key, base_url=base_url)
+        self.aclient = _create_async_client(secret_key, base_url)
     
     def chat(
         self, 
@@ -59,14 +119,82 @@ class HunyuanProvider(LLMProvider):
         except Exception as e:
             print(f"混元 API 调用错误: {e}")
             raise
+    
+    async def achat(
+        self, 
+        messages: List[Dict[str, str]], 
+        temperature: float = 0.7,
+        max_tokens: int = 2000
+    ) -> str:
+        """异步调用混元大模型"""
+        try:
+            response = await self.aclient.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            print(f"混元 API 调用错误: {e}")
+            raise
+    
+    def stream(
+        self, 
+        messages: List[Dict[str, str]], 
+        temperature: float = 0.7,
+        max_tokens: int = 2000
+    ) -> Iterator[str]:
+        """流式调用混元大模型"""
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            yield from _iter_chunks(response)
+        except Exception as e:
+            print(f"混元 API 调用错误: {e}")
+            raise
+    
+    async def astream(
+        self, 
+        messages: List[Dict[str, str]], 
+        temperature: float = 0.7,
+        max_tokens: int = 2000
+    ) -> AsyncIterator[str]:
+        """异步流式调用混元大模型"""
+        try:
+            response = await self.aclient.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            async for text in _aiter_chunks(response):
+                yield text
+        except Exception as e:
+            print(f"混元 API 调用错误: {e}")
+            raise
 
 
 class OpenAIProvider(LLMProvider):
     """OpenAI 大模型"""
     
-    def __init__(self, api_key: str, model: str = "gpt-3.5-turbo"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-3.5-turbo",
+        prompt_cache_key: Optional[str] = PROMPT_CACHE_KEY
+    ):
         self.model = model
         self.client = OpenAI(api_key=api_key)
+        self.aclient = _create_async_client(api_key)
+        # 所有请求共用同一段系统提示词前缀，提示 OpenAI 复用前缀缓存（省去重复的 prefill）
+        self.extra_body = {"prompt_cache_key": prompt_cache_key} if prompt_cache_key else None
     
     def chat(
         self, 
@@ -80,12 +208,81 @@ class OpenAIProvider(LLMProvider):
                 model=self.model,
                 messages=messages,
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                extra_body=self.extra_body
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            print(f"OpenAI API 调用错误: {e}")
+            raise
+    
+    async def achat(
+        self, 
+        messages: List[Dict[str, str]], 
+        temperature: float = 0.7,
+        max_tokens: int = 2000
+    ) -> str:
+        """异步调用 OpenAI"""
+        try:
+            response = await self.aclient.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                extra_body=self.extra_body
             )
             return response.choices[0].message.content
         except Exception as e:
             print(f"OpenAI API 调用错误: {e}")
             raise
+    
+    def stream(
+        self, 
+        messages: List[Dict[str, str]], 
+        temperature: float = 0.7,
+        max_tokens: int = 2000
+    ) -> Iterator[str]:
+        """流式调用 OpenAI"""
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                extra_body=self.extra_body
+            )
+            yield from _iter_chunks(response)
+        except Exception as e:
+            print(f"OpenAI API 调用错误: {e}")
+            raise
+    
+    async def astream(
+        self, 
+        messages: List[Dict[str, str]], 
+        temperature: float = 0.7,
+        max_tokens: int = 2000
+    ) -> AsyncIterator[str]:
+        """异步流式调用 OpenAI"""
+        try:
+            response = await self.aclient.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                extra_body=self.extra_body
+            )
+            async for text in _aiter_chunks(response):
+                yield text
+        except Exception as e:
+            print(f"OpenAI API 调用错误: {e}")
+            raise
+
+
+# Mock 提供者的关键词规则（模块加载时构建一次）
+_MOCK_EMOTION_KEYWORDS = frozenset({"累", "焦虑", "压力", "崩溃"})
+_MOCK_TASK_KEYWORDS = frozenset({"任务", "要做", "事情"})
 
 
 class MockProvider(LLMProvider):
@@ -101,7 +298,7 @@ class MockProvider(LLMProvider):
         user_message = messages[-1]["content"] if messages else ""
         
         # 简单的规则匹配
-        if any(keyword in user_message for keyword in ["累", "焦虑", "压力", "崩溃"]):
+        if any(keyword in user_message for keyword in _MOCK_EMOTION_KEYWORDS):
             return """听起来你现在压力挺大的。别急，我们一起来处理。
 
 要不这样：
@@ -110,7 +307,7 @@ class MockProvider(LLMProvider):
 
 你想试试哪个？"""
         
-        elif any(keyword in user_message for keyword in ["任务", "要做", "事情"]):
+        elif any(keyword in user_message for keyword in _MOCK_TASK_KEYWORDS):
             return """{
   "one_line_summary": "用户有多个任务待处理",
   "categories": ["work", "personal"],
@@ -147,6 +344,11 @@ class LLMService:
             provider_type: "openai" | "hunyuan" | "mock"
         """
         self.provider = self._create_provider(provider_type)
+        # 响应缓存（默认开启，LLM_CACHE_ENABLED=false 关闭）
+        self.cached = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+        if self.cached:
+            from .llm_cache import CachedLLMProvider
+            self.provider = CachedLLMProvider(self.provider)
     
     def _create_provider(self, provider_type: str) -> LLMProvider:
         """创建 LLM 提供者"""
@@ -180,10 +382,48 @@ class LLMService:
         self, 
         messages: List[Dict[str, str]], 
         temperature: float = 0.7,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        cache: Optional[bool] = None
     ) -> str:
-        """调用 LLM"""
+        """
+        调用 LLM
+        
+        Args:
+            cache: 是否使用响应缓存（None 时低温度调用自动缓存，未启用缓存时忽略）
+        """
+        if self.cached:
+            return self.provider.chat(messages, temperature, max_tokens, cache=cache)
         return self.provider.chat(messages, temperature, max_tokens)
+    
+    async def acall(
+        self, 
+        messages: List[Dict[str, str]], 
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        cache: Optional[bool] = None
+    ) -> str:
+        """异步调用 LLM（cache 参数同 call）"""
+        if self.cached:
+            return await self.provider.achat(messages, temperature, max_tokens, cache=cache)
+        return await self.provider.achat(messages, temperature, max_tokens)
+    
+    def stream(
+        self, 
+        messages: List[Dict[str, str]], 
+        temperature: float = 0.7,
+        max_tokens: int = 2000
+    ) -> Iterator[str]:
+        """流式调用 LLM，逐段产出文本（不经过响应缓存）"""
+        return self.provider.stream(messages, temperature, max_tokens)
+    
+    def astream(
+        self, 
+        messages: List[Dict[str, str]], 
+        temperature: float = 0.7,
+        max_tokens: int = 2000
+    ) -> AsyncIterator[str]:
+        """异步流式调用 LLM（不经过响应缓存）"""
+        return self.provider.astream(messages, temperature, max_tokens)
 
 
 # 全局 LLM 服务实例
@@ -211,11 +451,23 @@ def init_llm_service(provider_type: str):
 def call_llm(
     messages: List[Dict[str, str]], 
     temperature: float = 0.7,
-    max_tokens: int = 2000
+    max_tokens: int = 2000,
+    cache: Optional[bool] = None
 ) -> str:
     """便捷函数：调用 LLM"""
     service = get_llm_service()
-    return service.call(messages, temperature, max_tokens)
+    return service.call(messages, temperature, max_tokens, cache=cache)
+
+
+async def acall_llm(
+    messages: List[Dict[str, str]], 
+    temperature: float = 0.7,
+    max_tokens: int = 2000,
+    cache: Optional[bool] = None
+) -> str:
+    """便捷函数：异步调用 LLM"""
+    service = get_llm_service()
+    return await service.acall(messages, temperature, max_tokens, cache=cache)
 
 
 if __name__ == "__main__":
@@ -12,12 +12,21 @@
 
 import json
 import sqlite3
+import uuid
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
 from enum import Enum
 from pathlib import Path
 
+from .ttl_cache import TTLLRUCache
+
+
+def _rows_to_dicts(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+    """按列名把查询结果转换为字典列表（列名只从 cursor.description 读取一次）"""
+    cols = [c[0] for c in cursor.description]
+    return [dict(zip(cols, row)) for row in cursor]
+
 
 class MemoryType(Enum):
     """记忆类型"""
@@ -195,15 +204,14 @@ class MemoryStore:
     def get_memory(self, user_id: str, key: str) -> Optional[Memory]:
         """获取特定记忆"""
         with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
             cursor = conn.execute(
-                "SELECT * FROM memories WHERE user_id = ? AND key = ?",
+                "SELECT * FROM memories WHERE user_id = ? AND key = ? LIMIT 1",
                 (user_id, key)
             )
-            row = cursor.fetchone()
+            rows = _rows_to_dicts(cursor)
             
-            if row:
-                return self._row_to_memory(row)
+            if rows:
+                return self._row_to_memory(rows[0])
         return None
     
     def get_memories(
@@ -214,8 +222,6 @@ class MemoryStore:
     ) -> List[Memory]:
         """获取用户的记忆列表"""
         with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            
             if memory_type:
                 cursor = conn.execute(
                     """SELECT * FROM memories 
@@ -231,7 +237,26 @@ class MemoryStore:
                     (user_id, limit)
                 )
             
-            return [self._row_to_memory(row) for row in cursor.fetchall()]
+            return [self._row_to_memory(row) for row in _rows_to_dicts(cursor)]
+    
+    def get_memory_and_touch(self, user_id: str, key: str) -> Optional[Memory]:
+        """获取特定记忆并更新其最后使用时间（同一连接、同一事务内完成）"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute(
+                "SELECT * FROM memories WHERE user_id = ? AND key = ? LIMIT 1",
+                (user_id, key)
+            )
+            rows = _rows_to_dicts(cursor)
+            if not rows:
+                return None
+            
+            memory = self._row_to_memory(rows[0])
+            memory.last_used = datetime.now().isoformat()
+            conn.execute(
+                "UPDATE memories SET last_used = ? WHERE memory_id = ?",
+                (memory.last_used, memory.memory_id)
+            )
+            return memory
     
     def update_last_used(self, memory_id: str):
         """更新最后使用时间"""
@@ -241,6 +266,17 @@ class MemoryStore:
                 (datetime.now().isoformat(), memory_id)
             )
     
+    def update_last_used_many(self, memory_ids: List[str]):
+        """批量更新最后使用时间（一条 IN 查询，一次提交）"""
+        if not memory_ids:
+            return
+        placeholders = ",".join("?" * len(memory_ids))
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                f"UPDATE memories SET last_used = ? WHERE memory_id IN ({placeholders})",
+                (datetime.now().isoformat(), *memory_ids)
+            )
+    
     def delete_memory(self, memory_id: str) -> bool:
         """删除记忆"""
         try:
@@ -262,38 +298,49 @@ class MemoryStore:
             return False
     
     def cleanup_expired(self) -> int:
-        """清理过期记忆"""
-        count = 0
-        memories = self.get_all_memories()
-        
-        for mem in memories:
-            if mem.is_expired():
-                if self.delete_memory(mem.memory_id):
-                    count += 1
-        
-        return count
+        """
+        清理过期记忆（与 Memory.is_expired 判定一致）
+        在 SQL 中按每条记忆的 ttl_days 比较，不再逐条加载、解析时间并单独删除
+        """
+        now = datetime.now().isoformat()
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.execute(
+                    """DELETE FROM memories
+                       WHERE ttl_days IS NOT NULL
+                         AND julianday(?) - julianday(created_at) >= ttl_days + 1""",
+                    (now,)
+                )
+                return cursor.rowcount
+        except Exception as e:
+            print(f"清理过期记忆失败: {e}")
+            return 0
     
     def archive_unused(self, unused_days: int = 180) -> int:
-        """归档长期未使用的记忆"""
-        count = 0
-        memories = self.get_all_memories()
-        
-        for mem in memories:
-            if mem.should_archive(unused_days):
+        """
+        归档长期未使用的记忆（与 Memory.should_archive 判定一致）
+        截止时间只计算一次，last_used 为同格式的 ISO 字符串，可直接按字符串比较
+        """
+        cutoff = (datetime.now() - timedelta(days=unused_days + 1)).isoformat()
+        try:
+            with sqlite3.connect(self.db_path) as conn:
                 # 可以移到归档表或直接删除
-                if self.delete_memory(mem.memory_id):
-                    count += 1
-        
-        return count
+                cursor = conn.execute(
+                    "DELETE FROM memories WHERE last_used <= ?",
+                    (cutoff,)
+                )
+                return cursor.rowcount
+        except Exception as e:
+            print(f"归档记忆失败: {e}")
+            return 0
     
     def get_all_memories(self) -> List[Memory]:
         """获取所有记忆（用于维护任务）"""
         with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
             cursor = conn.execute("SELECT * FROM memories")
-            return [self._row_to_memory(row) for row in cursor.fetchall()]
+            return [self._row_to_memory(row) for row in _rows_to_dicts(cursor)]
     
-    def _row_to_memory(self, row: sqlite3.Row) -> Memory:
+    def _row_to_memory(self, row: Dict[str, Any]) -> Memory:
         """将数据库行转换为 Memory 对象"""
         return Memory(
             memory_id=row['memory_id'],
@@ -317,8 +364,19 @@ class MemoryStore:
 class MemoryManager:
     """记忆管理器（高级 API）"""
     
+    # 用户画像缓存时间（秒）：画像在会话内很少变化，经本管理器的写入会立即失效
+    PROFILE_CACHE_TTL = 30
+    # 缓存的用户数上限，超出时淘汰最久未访问的画像
+    PROFILE_CACHE_SIZE = 1024
+    
     def __init__(self, store: MemoryStore):
         self.store = store
+        self._profile_cache = TTLLRUCache(
+            maxsize=self.PROFILE_CACHE_SIZE, ttl=self.PROFILE_CACHE_TTL
+        )
+    
+    def _invalidate_profile(self, user_id: str):
+        self._profile_cache.pop(user_id)
     
     def remember(
         self, 
@@ -330,28 +388,27 @@ class MemoryManager:
         source: str = "user_input"
     ) -> Memory:
         """记住一个信息"""
-        import uuid
-        
+        now = datetime.now().isoformat()
         memory = Memory(
             memory_id=str(uuid.uuid4()),
             user_id=user_id,
             type=memory_type,
             key=key,
             value=value,
-            created_at=datetime.now().isoformat(),
-            last_used=datetime.now().isoformat(),
+            created_at=now,
+            last_used=now,
             ttl_days=ttl_days,
             source=source
         )
         
         self.store.add_memory(memory)
+        self._invalidate_profile(user_id)
         return memory
     
     def recall(self, user_id: str, key: str) -> Optional[Any]:
         """回忆一个信息"""
-        memory = self.store.get_memory(user_id, key)
+        memory = self.store.get_memory_and_touch(user_id, key)
         if memory:
-            self.store.update_last_used(memory.memory_id)
             return memory.value
         return None
     
@@ -359,17 +416,25 @@ class MemoryManager:
         """忘记一个信息"""
         memory = self.store.get_memory(user_id, key)
         if memory:
+            self._invalidate_profile(user_id)
             return self.store.delete_memory(memory.memory_id)
         return False
     
     def forget_all(self, user_id: str) -> bool:
         """忘记用户所有信息"""
+        self._invalidate_profile(user_id)
         return self.store.delete_all_user_memories(user_id)
     
     def get_user_profile(self, user_id: str) -> UserProfile:
-        """获取用户画像"""
+        """获取用户画像（短时缓存，避免每轮对话都查询记忆表）"""
+        cached = self._profile_cache.get(user_id)
+        if cached is not None:
+            return cached
+        
         memories = self.store.get_memories(user_id)
-        return UserProfile.from_memories(user_id, memories)
+        profile = UserProfile.from_memories(user_id, memories)
+        self._profile_cache.put(user_id, profile)
+        return profile
     
     def infer_and_remember(
         self, 
@@ -379,22 +444,22 @@ class MemoryManager:
         confidence: float = 0.7
     ) -> Memory:
         """推断并记住（低置信度，可被用户纠正）"""
-        import uuid
-        
+        now = datetime.now().isoformat()
         memory = Memory(
             memory_id=str(uuid.uuid4()),
             user_id=user_id,
             type=MemoryType.PATTERN,
             key=key,
             value=value,
-            created_at=datetime.now().isoformat(),
-            last_used=datetime.now().isoformat(),
+            created_at=now,
+            last_used=now,
             ttl_days=90,  # 推断的记忆 90 天后过期
             confidence=confidence,
             source="inferred"
         )
         
         self.store.add_memory(memory)
+        self._invalidate_profile(user_id)
         return memory
     
     def get_relevant_memories(
@@ -414,11 +479,12 @@ class MemoryManager:
             # 检查 key 或 value 是否包含上下文关键词
             if (context_lower in mem.key.lower() or 
                 context_lower in str(mem.value).lower()):
-                self.store.update_last_used(mem.memory_id)
                 relevant.append(mem)
                 if len(relevant) >= limit:
                     break
         
+        # 命中的记忆统一更新使用时间，而不是每条单独打开连接提交
+        self.store.update_last_used_many([mem.memory_id for mem in relevant])
         return relevant
 
 
@@ -480,10 +546,8 @@ class PrivacySettings:
 
 def is_sensitive_memory(memory: Memory, settings: PrivacySettings) -> bool:
     """检查记忆是否敏感"""
-    for topic in settings.sensitive_topics:
-        if topic.lower() in memory.key.lower():
-            return True
-    return False
+    key_lower = memory.key.lower()
+    return any(topic.lower() in key_lower for topic in settings.sensitive_topics)
 
 
 # ============================================================================
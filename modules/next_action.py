@@ -419,19 +419,26 @@ def adjust_suggestions_by_preferences(
 # 辅助函数
 # ============================================================================
 
+# 示例对话预先转换为 messages，各次调用共享（只读）
+_FEW_SHOT_MESSAGES = tuple(
+    message
+    for example in FEW_SHOT_EXAMPLES
+    for message in (
+        {"role": "user", "content": example["user_input"]},
+        {
+            "role": "assistant",
+            "content": json.dumps(example["assistant_output"], ensure_ascii=False, indent=2)
+        }
+    )
+)
+
+
 def build_next_action_prompt(task: str, include_examples: bool = True) -> List[Dict[str, str]]:
     """构建完整 prompt"""
-    messages = [
-        {"role": "system", "content": NEXT_ACTION_SYSTEM_PROMPT}
-    ]
+    messages = [{"role": "system", "content": NEXT_ACTION_SYSTEM_PROMPT}]
     
     if include_examples:
-        for example in FEW_SHOT_EXAMPLES:
-            messages.append({"role": "user", "content": example["user_input"]})
-            messages.append({
-                "role": "assistant",
-                "content": json.dumps(example["assistant_output"], ensure_ascii=False, indent=2)
-            })
+        messages.extend(_FEW_SHOT_MESSAGES)
     
     messages.append({"role": "user", "content": f"任务：{task}"})
     
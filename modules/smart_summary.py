@@ -355,6 +355,20 @@ class SmartSummaryParser:
 # 构建完整 Prompt 的辅助函数
 # ============================================================================
 
+# few-shot 示例的 JSON 序列化在导入时做一次，结果在各次调用间共享，不应修改
+_FEW_SHOT_MESSAGES = tuple(
+    message
+    for example in FEW_SHOT_EXAMPLES
+    for message in (
+        {"role": "user", "content": example["user_input"]},
+        {
+            "role": "assistant",
+            "content": json.dumps(example["assistant_output"], ensure_ascii=False, indent=2)
+        }
+    )
+)
+
+
 def build_smart_summary_prompt(user_input: str, include_examples: bool = True) -> List[Dict[str, str]]:
     """
     构建完整的 LLM prompt（messages 格式）
@@ -366,17 +380,11 @@ def build_smart_summary_prompt(user_input: str, include_examples: bool = True) -
     Returns:
         messages 列表（适用于 OpenAI API 等）
     """
-    messages = [
-        {"role": "system", "content": SMART_SUMMARY_SYSTEM_PROMPT}
-    ]
+    # 系统消息每次新建：lifeos_real 会在其中追加用户记忆
+    messages = [{"role": "system", "content": SMART_SUMMARY_SYSTEM_PROMPT}]
     
     if include_examples:
-        for example in FEW_SHOT_EXAMPLES:
-            messages.append({"role": "user", "content": example["user_input"]})
-            messages.append({
-                "role": "assistant", 
-                "content": json.dumps(example["assistant_output"], ensure_ascii=False, indent=2)
-            })
+        messages.extend(_FEW_SHOT_MESSAGES)
     
     messages.append({"role": "user", "content": user_input})
     
@@ -10,6 +10,12 @@
 5. 微调建议
 """
 
+# 提示词版本：修改下方任何提示词内容时必须同步递增，
+# 使提供方的前缀缓存（prompt_cache_key）随之失效
+SYSTEM_PROMPT_VERSION = "v1"
+PROMPT_CACHE_KEY = f"lifeos_sys_{SYSTEM_PROMPT_VERSION}"
+
+
 # ============================================================================
 # 主系统提示词（Master System Prompt）
 # ============================================================================
@@ -404,6 +410,15 @@ FINE_TUNING_RECOMMENDATIONS = """# LifeOS 微调建议
 # 组合使用示例
 # ============================================================================
 
+# 各模式的完整提示词在加载时拼好，每次调用返回同一个字符串，
+# 保证请求前缀逐字节一致，提供方的前缀缓存才能命中
+_COMPOSED_PROMPTS = {
+    "master": MASTER_SYSTEM_PROMPT,
+    "emotion": MASTER_SYSTEM_PROMPT + "\n\n" + EMOTION_SUPPORT_PROMPT,
+    "action": MASTER_SYSTEM_PROMPT + "\n\n" + ACTION_ASSISTANT_PROMPT,
+}
+
+
 def get_system_prompt(mode: str = "master") -> str:
     """
     获取系统提示词
@@ -414,12 +429,7 @@ def get_system_prompt(mode: str = "master") -> str:
     Returns:
         完整的系统提示词
     """
-    if mode == "emotion":
-        return MASTER_SYSTEM_PROMPT + "\n\n" + EMOTION_SUPPORT_PROMPT
-    elif mode == "action":
-        return MASTER_SYSTEM_PROMPT + "\n\n" + ACTION_ASSISTANT_PROMPT
-    else:
-        return MASTER_SYSTEM_PROMPT
+    return _COMPOSED_PROMPTS.get(mode, MASTER_SYSTEM_PROMPT)
 
 
 def add_memory_context(base_prompt: str, user_memories: dict) -> str:
@@ -462,6 +472,8 @@ def add_memory_context(base_prompt: str, user_memories: dict) -> str:
 # ============================================================================
 
 __all__ = [
+    'SYSTEM_PROMPT_VERSION',
+    'PROMPT_CACHE_KEY',
     'MASTER_SYSTEM_PROMPT',
     'EMOTION_SUPPORT_PROMPT',
     'ACTION_ASSISTANT_PROMPT',
@@ -4,21 +4,30 @@ FastAPI + WebSocket 实时通信
 支持所有 6 种意图 + 多轮对话 + 完整 Prompt 集成
 """
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Depends
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
-import json
 import asyncio
-from datetime import datetime
+import json
+import logging
 import os
 from pathlib import Path
+from functools import lru_cache
 import traceback
 
-from agents.workflow_complete import create_complete_workflow
-from agents.conversation_manager import ConversationManager
+from agents.workflow_complete import create_complete_workflow, CompleteLifeOSWorkflow
+from agents.conversation_manager import ConversationManager, MAX_HISTORY_TURNS
+from agents.time_cache import now_iso_cached
+
+# 日志配置：默认 INFO，LOG_LEVEL=DEBUG 时输出工作流各节点的详细跟踪
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
 
 # 创建 FastAPI 应用
 app = FastAPI(
@@ -36,9 +45,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+class NonStreamingGZipMiddleware(GZipMiddleware):
+    """GZip 压缩（跳过 SSE 流式接口，避免压缩缓冲导致事件延迟推送）"""
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].endswith("/stream"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+# 响应压缩：对话历史、任务列表等 JSON 重复度高，压缩后体积通常缩小数倍
+app.add_middleware(NonStreamingGZipMiddleware, minimum_size=1024, compresslevel=6)
+
 # 全局变量
-workflow = None
-conversation_manager = None
 active_connections: Dict[str, WebSocket] = {}  # 改为字典，用 user_id 作为 key
 
 
@@ -84,6 +105,114 @@ class HealthResponse(BaseModel):
     prompts_loaded: List[str]
 
 
+# ============================================================================
+# 静态数据（模块加载时构建一次，各请求共享）
+# ============================================================================
+
+INTENT_CATALOG = [
+    {
+        "id": "task_management",
+        "name": "任务管理",
+        "description": "整理待办、智能排序、优先级分析",
+        "icon": "📋",
+        "examples": ["我今天要写报告、开会", "帮我整理任务"]
+    },
+    {
+        "id": "emotion_support",
+        "name": "情绪支持",
+        "description": "倾听理解、温暖陪伴、情绪疏导",
+        "icon": "💚",
+        "examples": ["好累啊", "压力好大", "很焦虑"]
+    },
+    {
+        "id": "habit_tracking",
+        "name": "习惯追踪",
+        "description": "习惯养成、打卡记录、数据统计",
+        "icon": "🎯",
+        "examples": ["我想养成跑步习惯", "帮我设计打卡计划"]
+    },
+    {
+        "id": "goal_setting",
+        "name": "目标规划",
+        "description": "拆解目标、学习路径、多轮对话",
+        "icon": "🌟",
+        "examples": ["我想学 Python", "今年想考研"]
+    },
+    {
+        "id": "reflection",
+        "name": "反思总结",
+        "description": "定期回顾、4D 模型、持续改进",
+        "icon": "📝",
+        "examples": ["总结这周", "反思学习状态"]
+    },
+    {
+        "id": "casual_chat",
+        "name": "闲聊对话",
+        "description": "日常问候、功能咨询、自然交流",
+        "icon": "💬",
+        "examples": ["你好", "你有什么功能", "谢谢"]
+    }
+]
+
+SUPPORTED_INTENTS = [intent["id"] for intent in INTENT_CATALOG]
+
+PROMPTS_LOADED = [
+    "complete_intent_recognition_prompt",
+    "enhanced_task_extraction_prompt",
+    "personalization_prompt",
+    "emotion_support_prompt",
+    "habit_management_prompt",
+    "goal_planning_prompt",
+    "reflection_prompt"
+]
+
+_INTENTS_RESPONSE_BODY = json.dumps(
+    {"intents": INTENT_CATALOG}, ensure_ascii=False
+).encode("utf-8")
+
+
+# ============================================================================
+# 依赖注入（首次使用时创建，全局共享同一实例）
+# ============================================================================
+
+@lru_cache(maxsize=1)
+def get_db_path() -> str:
+    """数据库路径（相对路径基于项目根目录）"""
+    db_path = os.getenv("DB_PATH", "lifeos_data.db")
+    if not os.path.isabs(db_path):
+        db_path = Path(__file__).parent / db_path
+    return str(db_path)
+
+
+@lru_cache(maxsize=1)
+def get_workflow() -> Optional[CompleteLifeOSWorkflow]:
+    """获取工作流实例（从环境变量读取配置），初始化失败返回 None"""
+    try:
+        return create_complete_workflow(
+            llm_provider=os.getenv("LLM_PROVIDER", "mock"),
+            model_name=os.getenv("MODEL_NAME", "hunyuan-large"),
+            db_path=get_db_path()
+        )
+    except Exception as e:
+        print(f"❌ 工作流初始化失败: {e}")
+        traceback.print_exc()
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_conversation_manager() -> Optional[ConversationManager]:
+    """获取对话管理器，优先复用工作流内部的实例，避免重复打开数据库"""
+    workflow = get_workflow()
+    if workflow and workflow.conversation_manager:
+        return workflow.conversation_manager
+    try:
+        return ConversationManager(get_db_path())
+    except Exception as e:
+        print(f"❌ 对话管理器初始化失败: {e}")
+        print(f"📁 数据库路径: {get_db_path()}")
+        return None
+
+
 # ============================================================================
 # 启动事件
 # ============================================================================
@@ -91,8 +220,6 @@ class HealthResponse(BaseModel):
 @app.on_event("startup")
 async def startup_event():
     """应用启动时初始化"""
-    global workflow, conversation_manager
-    
     print("="*70)
     print("🚀 正在启动 LifeOS AI Assistant...")
     print("="*70)
@@ -105,37 +232,26 @@ async def startup_event():
         print(f"⚠️  前端文件不存在: {static_path}")
         print(f"💡 提示: 创建 static/index.html 以启用 Web UI")
     
-    # 初始化对话管理器
-    try:
-        db_path = os.getenv("DB_PATH", "lifeos_data.db")
-        # 如果是相对路径，确保使用项目根目录
-        if not os.path.isabs(db_path):
-            db_path = Path(__file__).parent / db_path
-        
-        conversation_manager = ConversationManager(str(db_path))
+    # 预热工作流和对话管理器（两者共享同一个实例和数据库连接配置）
+    workflow = get_workflow()
+    conversation_manager = get_conversation_manager()
+    if conversation_manager:
         print(f"✅ 对话管理器初始化成功")
-        print(f"   📁 数据库: {db_path}")
-    except Exception as e:
-        print(f"❌ 对话管理器初始化失败: {e}")
-        print(f"⚠️  继续启动，但对话记忆功能将不可用")
-        conversation_manager = None
-    
-    # 创建工作流（从环境变量读取配置）
-    llm_provider = os.getenv("LLM_PROVIDER", "mock")
-    model_name = os.getenv("MODEL_NAME", "hunyuan-large")
+        print(f"   📁 数据库: {get_db_path()}")
+        archived = await asyncio.to_thread(
+            conversation_manager.maintenance,
+            int(os.getenv("CONVERSATION_ARCHIVE_DAYS", "90"))
+        )
+        if archived:
+            print(f"   🗄️  已归档 {archived} 轮历史对话")
+    else:
+        print(f"⚠️  对话记忆功能不可用")
     
     print(f"\n🔧 配置信息:")
-    print(f"   • LLM 提供商: {llm_provider}")
-    print(f"   • 模型名称: {model_name}")
-    if conversation_manager:
-        print(f"   • 数据库: {db_path}")
+    print(f"   • LLM 提供商: {os.getenv('LLM_PROVIDER', 'mock')}")
+    print(f"   • 模型名称: {os.getenv('MODEL_NAME', 'hunyuan-large')}")
     
-    try:
-        workflow = create_complete_workflow(
-            llm_provider=llm_provider,
-            model_name=model_name,
-            db_path=str(db_path) if conversation_manager else "lifeos_data.db"
-        )
+    if workflow:
         print(f"✅ 工作流初始化成功")
         
         # 显示支持的功能
@@ -148,11 +264,6 @@ async def startup_event():
         print(f"   ✓ 反思总结 (4D 模型)")
         print(f"   ✓ 闲聊对话 (自然交流)")
         print(f"   ✓ 个性化增强 (用户画像)")
-        
-    except Exception as e:
-        print(f"❌ 工作流初始化失败: {e}")
-        traceback.print_exc()
-        workflow = None
     
     print("\n" + "="*70)
     print("✅ LifeOS AI Assistant 启动完成")
@@ -177,6 +288,16 @@ async def shutdown_event():
         except:
             pass
     
+    # 后台写线程是守护线程，退出前显式提交排队中的对话并关闭连接
+    # （工作流的对话管理器随工作流一起关闭，重复 close 无副作用）
+    workflow = get_workflow()
+    if workflow:
+        await asyncio.to_thread(workflow.close)
+    conversation_manager = get_conversation_manager()
+    if conversation_manager:
+        await asyncio.to_thread(conversation_manager.close)
+        print("   ✓ 对话记录已全部保存")
+    
     print("✅ 清理完成，再见！\n")
 
 
@@ -372,7 +493,10 @@ async def root():
 # ============================================================================
 
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(
+    request: ChatRequest,
+    workflow: Optional[CompleteLifeOSWorkflow] = Depends(get_workflow)
+):
     """
     聊天接口 - 同步版本（HTTP POST）
     支持所有 6 种意图 + 完整功能
@@ -389,8 +513,8 @@ async def chat(request: ChatRequest):
         print(f"   • 会话: {request.session_id or '新会话'}")
         print(f"   • 消息: {request.message[:50]}...")
         
-        # 执行工作流
-        result = workflow.run(
+        # 异步执行工作流，不阻塞事件循环
+        result = await workflow.arun(
             user_input=request.message,
             user_id=request.user_id,
             session_id=request.session_id
@@ -406,7 +530,7 @@ async def chat(request: ChatRequest):
             processing_steps=result.get("processing_steps", []),
             analyzed_tasks=result.get("analyzed_tasks", []),
             priority_analysis=result.get("priority_analysis", {}),
-            timestamp=datetime.now().isoformat()
+            timestamp=now_iso_cached()
         )
         
         print(f"✅ 处理完成:")
@@ -422,6 +546,59 @@ async def chat(request: ChatRequest):
         raise HTTPException(status_code=500, detail=f"处理失败: {str(e)}")
 
 
+@app.post("/api/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    workflow: Optional[CompleteLifeOSWorkflow] = Depends(get_workflow)
+):
+    """
+    聊天接口 - 流式版本（Server-Sent Events）
+    每完成一个处理步骤就推送一次，最后推送完整回复
+    """
+    if not workflow:
+        raise HTTPException(
+            status_code=503,
+            detail="工作流未初始化，请检查服务配置"
+        )
+    
+    print(f"\n📨 收到流式聊天请求: {request.user_id} / {request.message[:50]}...")
+    
+    def event_stream():
+        # 同步生成器由 StreamingResponse 放到线程池中迭代，不阻塞事件循环
+        try:
+            for event in workflow.stream(
+                user_input=request.message,
+                user_id=request.user_id,
+                session_id=request.session_id
+            ):
+                if event["type"] == "final":
+                    result = event["result"]
+                    event = {
+                        "type": "response",
+                        "session_id": result.get("session_id", ""),
+                        "intent": result.get("intent", "unknown"),
+                        "confidence": result.get("confidence", 0.0),
+                        "context_continuation": result.get("context_continuation", False),
+                        "response": result.get("final_output", ""),
+                        "processing_steps": result.get("processing_steps", []),
+                        "analyzed_tasks": result.get("analyzed_tasks", []),
+                        "priority_analysis": result.get("priority_analysis", {}),
+                        "timestamp": now_iso_cached()
+                    }
+                yield f"data: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+        except Exception as e:
+            print(f"❌ 流式聊天处理失败: {e}")
+            traceback.print_exc()
+            error = {"type": "error", "message": f"处理失败: {str(e)}"}
+            yield f"data: {json.dumps(error, ensure_ascii=False)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get("/api/sessions/{user_id}")
 async def get_user_sessions(user_id: str):
     """获取用户所有会话列表"""
@@ -439,15 +616,22 @@ async def get_user_sessions(user_id: str):
 
 
 @app.get("/api/session/{session_id}/history")
-async def get_session_history(session_id: str, last_n: int = 10):
-    """获取会话历史记录"""
+async def get_session_history(
+    session_id: str,
+    last_n: int = 10,
+    conversation_manager: Optional[ConversationManager] = Depends(get_conversation_manager)
+):
+    """获取会话历史记录（包含刚刚回复、仍在后台写入中的轮次）"""
     if not conversation_manager:
         raise HTTPException(status_code=503, detail="对话管理器未初始化")
     
     try:
-        history = conversation_manager.get_conversation_history(
+        # /api/chat 返回时对话可能还在后台写队列中，先等写入提交再读
+        await conversation_manager.aflush()
+        history = await conversation_manager.aget_conversation_history(
             session_id,
-            last_n_turns=last_n
+            # 超出对话管理器读取上限时按上限返回
+            last_n_turns=min(last_n, MAX_HISTORY_TURNS)
         )
         
         return {
@@ -460,13 +644,17 @@ async def get_session_history(session_id: str, last_n: int = 10):
 
 
 @app.get("/api/session/{session_id}/stats", response_model=SessionInfo)
-async def get_session_stats(session_id: str):
-    """获取会话统计信息"""
+async def get_session_stats(
+    session_id: str,
+    conversation_manager: Optional[ConversationManager] = Depends(get_conversation_manager)
+):
+    """获取会话统计信息（包含刚刚回复、仍在后台写入中的轮次）"""
     if not conversation_manager:
         raise HTTPException(status_code=503, detail="对话管理器未初始化")
     
     try:
-        stats = conversation_manager.get_session_stats(session_id)
+        await conversation_manager.aflush()
+        stats = await conversation_manager.aget_session_stats(session_id)
         
         if not stats:
             raise HTTPException(status_code=404, detail="会话不存在")
@@ -501,7 +689,12 @@ async def delete_session(session_id: str):
 # ============================================================================
 
 @app.websocket("/ws/{user_id}")
-async def websocket_endpoint(websocket: WebSocket, user_id: str):
+async def websocket_endpoint(
+    websocket: WebSocket,
+    user_id: str,
+    workflow: Optional[CompleteLifeOSWorkflow] = Depends(get_workflow),
+    conversation_manager: Optional[ConversationManager] = Depends(get_conversation_manager)
+):
     """
     WebSocket 连接 - 实时对话
     支持完整的意图识别和多轮对话
@@ -514,7 +707,7 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
     # 创建会话
     session_id = None
     if conversation_manager:
-        session_id = conversation_manager.create_session(user_id)
+        session_id = await conversation_manager.acreate_session(user_id)
         print(f"   ✓ 创建会话: {session_id}")
     
     # 发送欢迎消息
@@ -522,7 +715,7 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
         "type": "connected",
         "session_id": session_id,
         "message": "连接成功！我是 LifeOS 智能助理 😊\n\n我可以帮你：\n• 📋 管理任务和待办\n• 💚 提供情绪支持\n• 🎯 追踪习惯打卡\n• 🌟 规划目标路径\n• 📝 反思总结经验\n\n有什么可以帮你的吗？",
-        "timestamp": datetime.now().isoformat()
+        "timestamp": now_iso_cached()
     })
     
     try:
@@ -541,13 +734,12 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
             await websocket.send_json({
                 "type": "thinking",
                 "message": "🤔 正在思考...",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso_cached()
             })
             
             try:
                 # 执行工作流（异步）
-                result = await asyncio.to_thread(
-                    workflow.run,
+                result = await workflow.arun(
                     user_input=user_message,
                     user_id=user_id,
                     session_id=session_id
@@ -572,7 +764,7 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
                     "processing_steps": result.get("processing_steps", []),
                     "analyzed_tasks": result.get("analyzed_tasks", []),
                     "priority_analysis": result.get("priority_analysis", {}),
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": now_iso_cached()
                 })
             
             except Exception as e:
@@ -582,7 +774,7 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
                 await websocket.send_json({
                     "type": "error",
                     "message": f"抱歉，处理时出现问题：{str(e)}",
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": now_iso_cached()
                 })
     
     except WebSocketDisconnect:
@@ -598,7 +790,7 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
             await websocket.send_json({
                 "type": "error",
                 "message": f"连接出现问题: {str(e)}",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso_cached()
             })
         except:
             pass
@@ -612,90 +804,27 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
 # ============================================================================
 
 @app.get("/health", response_model=HealthResponse)
-async def health_check():
+async def health_check(workflow: Optional[CompleteLifeOSWorkflow] = Depends(get_workflow)):
     """健康检查 - 返回系统状态"""
     workflow_status = "initialized" if workflow else "not_initialized"
     llm_provider = os.getenv("LLM_PROVIDER", "mock")
     
-    supported_intents = [
-        "task_management",
-        "emotion_support",
-        "habit_tracking",
-        "goal_setting",
-        "reflection",
-        "casual_chat"
-    ]
-    
-    prompts_loaded = [
-        "complete_intent_recognition_prompt",
-        "enhanced_task_extraction_prompt",
-        "personalization_prompt",
-        "emotion_support_prompt",
-        "habit_management_prompt",
-        "goal_planning_prompt",
-        "reflection_prompt"
-    ]
-    
     return HealthResponse(
         status="healthy" if workflow else "degraded",
         version="2.1.0",
         workflow_status=workflow_status,
         llm_provider=llm_provider,
         active_connections=len(active_connections),
-        supported_intents=supported_intents,
-        prompts_loaded=prompts_loaded
+        supported_intents=SUPPORTED_INTENTS,
+        prompts_loaded=PROMPTS_LOADED
     )
 
 
 @app.get("/api/intents")
 async def get_supported_intents():
     """获取支持的意图列表"""
-    return {
-        "intents": [
-            {
-                "id": "task_management",
-                "name": "任务管理",
-                "description": "整理待办、智能排序、优先级分析",
-                "icon": "📋",
-                "examples": ["我今天要写报告、开会", "帮我整理任务"]
-            },
-            {
-                "id": "emotion_support",
-                "name": "情绪支持",
-                "description": "倾听理解、温暖陪伴、情绪疏导",
-                "icon": "💚",
-                "examples": ["好累啊", "压力好大", "很焦虑"]
-            },
-            {
-                "id": "habit_tracking",
-                "name": "习惯追踪",
-                "description": "习惯养成、打卡记录、数据统计",
-                "icon": "🎯",
-                "examples": ["我想养成跑步习惯", "帮我设计打卡计划"]
-            },
-            {
-                "id": "goal_setting",
-                "name": "目标规划",
-                "description": "拆解目标、学习路径、多轮对话",
-                "icon": "🌟",
-                "examples": ["我想学 Python", "今年想考研"]
-            },
-            {
-                "id": "reflection",
-                "name": "反思总结",
-                "description": "定期回顾、4D 模型、持续改进",
-                "icon": "📝",
-                "examples": ["总结这周", "反思学习状态"]
-            },
-            {
-                "id": "casual_chat",
-                "name": "闲聊对话",
-                "description": "日常问候、功能咨询、自然交流",
-                "icon": "💬",
-                "examples": ["你好", "你有什么功能", "谢谢"]
-            }
-        ]
-    }
+    # 内容固定，直接返回模块加载时序列化好的 JSON
+    return Response(content=_INTENTS_RESPONSE_BODY, media_type="application/json")
 
 
 # ============================================================================